@@ -1,17 +1,65 @@
 import json
 import os
+import sys
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from enum import Enum
 from typing import Optional, List
-from fastapi import FastAPI, HTTPException, Body
+from fastapi import FastAPI, HTTPException, Body, Query, Response
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from web3 import Web3
+from web3 import Web3, AsyncWeb3, AsyncHTTPProvider
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
+# Modul bersama (dao_core) ada di root repo
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from dao_core.nonce import NonceManager
+from dao_core.receipts import ReceiptTracker, PENDING, DROPPED
+from dao_core.fees import FeeOracle
+from dao_core.reads import BatchReader
+from dao_core.cache import ReadCache
+from dao_core.event_store import EventStore
+from dao_core.fleet import FleetTable
+from dao_core.proposals import ProposalStore
+from dao_core.dividends import DividendEngine
+from dao_core.analytics import SalesAnalytics
+from dao_core.erc20 import ERC20_READ_ABI
+
 # ================= SETUP =================
 load_dotenv()
 
-app = FastAPI(title="Vending Machine DAO API", version="1.0")
+# Koneksi Blockchain
+RPC_URL = os.getenv("RPC_URL")
+CONTRACT_ADDRESS = os.getenv("CONTRACT_ADDRESS")
+ADMIN_PRIVATE_KEY = os.getenv("ADMIN_PRIVATE_KEY")
+ADMIN_ADDRESS = os.getenv("ADMIN_ADDRESS")
+MULTICALL_ADDRESS = os.getenv("MULTICALL_ADDRESS") # Opsional: Multicall3 untuk batch view call
+TX_WEBHOOK_URL = os.getenv("TX_WEBHOOK_URL") # Opsional: POST status akhir setiap transaksi admin
+
+# Pool koneksi HTTP ke node (keep-alive, dipakai ulang antar request)
+RPC_POOL_SIZE = int(os.getenv("RPC_POOL_SIZE", "100"))   # Maks koneksi bersamaan
+RPC_TIMEOUT = float(os.getenv("RPC_TIMEOUT", "30"))      # Detik per request RPC
+RPC_KEEPALIVE = float(os.getenv("RPC_KEEPALIVE", "30"))  # Detik koneksi idle tetap dibuka
+
+@asynccontextmanager
+async def lifespan(app):
+    # Session aiohttp harus dibuat di event loop server. Default web3
+    # menutup koneksi setiap request (force_close), di sini dipakai ulang.
+    session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=RPC_POOL_SIZE, keepalive_timeout=RPC_KEEPALIVE),
+        raise_for_status=True,
+    )
+    await aw3.provider.cache_async_session(session)
+    await aw3.eth.chain_id  # Isi cache eth_chainId sebelum request pertama
+    yield
+    await session.close()
+
+app = FastAPI(title="Vending Machine DAO API", version="1.0", lifespan=lifespan)
 
 # CORS (Agar Frontend bisa akses API ini)
 app.add_middleware(
@@ -22,13 +70,43 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Koneksi Blockchain
-RPC_URL = os.getenv("RPC_URL")
-CONTRACT_ADDRESS = os.getenv("CONTRACT_ADDRESS")
-ADMIN_PRIVATE_KEY = os.getenv("ADMIN_PRIVATE_KEY")
-ADMIN_ADDRESS = os.getenv("ADMIN_ADDRESS")
+# Handler memakai AsyncWeb3 (tidak memblok event loop)
+aw3 = AsyncWeb3(AsyncHTTPProvider(
+    RPC_URL,
+    request_kwargs={"timeout": aiohttp.ClientTimeout(total=RPC_TIMEOUT)},
+    cache_allowed_requests=True,  # eth_chainId (dicek middleware tiap call) cukup sekali
+))
+
+# Web3 sync tetap dipakai komponen background (receipt, cache, tabel event),
+# dengan pool koneksi yang sama besarnya
+http_session = requests.Session()
+http_session.mount("http://", HTTPAdapter(pool_maxsize=RPC_POOL_SIZE))
+http_session.mount("https://", HTTPAdapter(pool_maxsize=RPC_POOL_SIZE))
+w3 = Web3(Web3.HTTPProvider(RPC_URL, session=http_session, request_kwargs={"timeout": RPC_TIMEOUT}))
 
-w3 = Web3(Web3.HTTPProvider(RPC_URL))
+# Nonce admin dibagikan lokal (aman untuk request admin yang bersamaan)
+nonces = NonceManager(aw3)
+
+# Receipt transaksi admin dipantau di background; endpoint write
+# langsung return tx hash, status dicek lewat GET /tx/{hash}
+receipts = ReceiptTracker(w3).start()
+
+# Event contract disimpan lokal (Parquet) dan dibagikan ke fleet / proposals /
+# dividends / analytics: satu sweep eth_getLogs, hanya blok final
+EVENT_STORE_PATH = os.getenv("EVENT_STORE_PATH", "events_store")
+DEPLOY_BLOCK = int(os.getenv("DEPLOY_BLOCK", "0")) # Blok deploy contract (awal indexing)
+# Kedalaman konfirmasi (anti reorg). Kosong = default per chain ID
+EVENT_CONFIRMATIONS = int(os.getenv("EVENT_CONFIRMATIONS")) if os.getenv("EVENT_CONFIRMATIONS") else None
+
+# Batas bucket jam / hari analitik penjualan (jam lokal, default WIB)
+ANALYTICS_TZ_OFFSET = int(float(os.getenv("ANALYTICS_TZ_HOURS", "7")) * 3600)
+
+MAX_BATCH_INVESTORS = 1000
+INVESTOR_CHUNK = 100 # Wallet per batch read (hasil di-stream per chunk)
+
+# Tx admin terakhir (hash -> tx), untuk speed-up (replace-by-fee)
+admin_txs = OrderedDict()
+MAX_ADMIN_TXS = 1000
 
 # Load ABI
 try:
@@ -36,6 +114,27 @@ try:
         abi = json.load(f)
     contract = w3.eth.contract(address=CONTRACT_ADDRESS, abi=abi)
     print(f"[SYSTEM] Connected to Contract at {CONTRACT_ADDRESS}")
+
+    # Gas & fee dari node (chain ID dibaca sekali di sini)
+    fees = FeeOracle(w3, async_w3=aw3)
+    print(f"[SYSTEM] Chain ID {fees.chain_id}")
+
+    # Cache view call per blok (konstanta disimpan selamanya)
+    cache = ReadCache(w3)
+    # View call dikumpulkan jadi 1 round-trip (batch JSON-RPC / Multicall3),
+    # versi async: eth_call bersamaan (asyncio.gather)
+    reader = BatchReader(w3, MULTICALL_ADDRESS, cache=cache, async_w3=aw3)
+    # Satu penyimpan event (sampai head - konfirmasi) untuk semua komponen di bawah
+    events = EventStore(w3, contract, path=EVENT_STORE_PATH, start_block=DEPLOY_BLOCK,
+                        confirmations=EVENT_CONFIRMATIONS)
+    # Tabel armada di memori (struct batch + totalSales dari CoffeeOrdered)
+    fleet = FleetTable(w3, contract, reader, events)
+    # Proposal + tally suara dari event ProposalCreated / Voted / ProposalExecuted
+    proposals = ProposalStore(w3, contract, reader, events)
+    # Dividen semua holder dihitung off-chain dari event (magnifiedDividendPerShare)
+    dividends = DividendEngine(w3, contract, reader, events)
+    # Rollup penjualan per mesin per jam / hari (CoffeeOrdered + timestamp blok)
+    analytics = SalesAnalytics(w3, contract, reader, events, tz_offset=ANALYTICS_TZ_OFFSET)
 except Exception as e:
     print(f"[ERROR] {e}")
 
@@ -47,6 +146,24 @@ class ProposalType(int, Enum):
     UPDATE_SALARY = 2
     ADD_VENDOR = 3
 
+class MachineSort(str, Enum):
+    ID = "id"
+    SALES = "sales"
+    LOCATION = "location"
+
+class SortOrder(str, Enum):
+    ASC = "asc"
+    DESC = "desc"
+
+class ProposalStatus(str, Enum):
+    ACTIVE = "active"
+    EXPIRED = "expired"
+    EXECUTED = "executed"
+
+class Resolution(str, Enum):
+    HOUR = "hour"
+    DAY = "day"
+
 class ProposalInput(BaseModel):
     p_type: ProposalType
     target: str # Address target (Vendor/Staff)
@@ -69,121 +186,342 @@ class TransferShareInput(BaseModel):
     to_address: str
     amount_shares: int
 
+class InvestorBatchInput(BaseModel):
+    addresses: List[str]
+
 # ================= HELPER =================
 
-def send_admin_tx(func):
-    """Fungsi helper untuk Admin menandatangani transaksi di server"""
-    nonce = w3.eth.get_transaction_count(ADMIN_ADDRESS)
-    tx = func.build_transaction({
-        'chainId': 1337, # Ganache Chain ID
-        'gas': 3000000,
-        'gasPrice': w3.to_wei('20', 'gwei'),
-        'nonce': nonce,
-        'from': ADMIN_ADDRESS
-    })
+async def sign_and_send_admin(tx, **info):
+    """Tandatangani tx admin, kirim, lalu lacak receipt-nya"""
     signed_tx = w3.eth.account.sign_transaction(tx, ADMIN_PRIVATE_KEY)
-    tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-    return w3.to_hex(tx_hash)
+    tx_hash = w3.to_hex(await aw3.eth.send_raw_transaction(signed_tx.raw_transaction))
+    receipts.track(tx_hash, webhook=TX_WEBHOOK_URL, **info)
+
+    admin_txs[tx_hash] = (tx, info)
+    while len(admin_txs) > MAX_ADMIN_TXS:
+        admin_txs.popitem(last=False)
+    return tx_hash
+
+async def send_admin_tx(func, precheck=False):
+    """
+    Fungsi helper untuk Admin menandatangani transaksi di server.
+    precheck=True: gas selalu diestimasi (tanpa cache), jadi revert contract
+    dikembalikan sebagai error 400 sebelum tx dikirim.
+    """
+    async with nonces.reserve_async(ADMIN_ADDRESS) as nonce:
+        # Gas = estimasi (cache per fungsi) + margin, fee EIP-1559 dari feeHistory,
+        # dibaca lewat AsyncWeb3 (tidak memblok event loop / thread pool)
+        tx = await fees.build_async(func, ADMIN_ADDRESS, nonce, precheck=precheck)
+        return await sign_and_send_admin(tx, function=func.fn_name)
+
+async def synced(component):
+    """
+    Bawa komponen event (fleet / proposals / dividends / analytics) ke blok
+    final terbaru. Head dicek lewat AsyncWeb3 (di-cache); hanya jika ada
+    blok final baru, sync EventStore + replay dijalankan di thread pool.
+    """
+    head = await cache.head_async(aw3)
+    if component.block is not None and events.confirmed(head) <= component.block:
+        return component.block
+    return await run_in_threadpool(component.sync)
+
+token_contracts = {}
+
+async def get_token_contracts():
+    """Contract IDRT & $MESIN (alamat dibaca sekali, tidak pernah berubah)"""
+    if not token_contracts:
+        data, _ = await reader.read_async({
+            "asset": contract.functions.assetToken(),
+            "payment": contract.functions.paymentToken(),
+        })
+        for name, address in data.items():
+            token_contracts[name] = w3.eth.contract(address=address, abi=ERC20_READ_ABI)
+    return token_contracts["asset"], token_contracts["payment"]
 
 # ================= READ ENDPOINTS (UMUM) =================
 
 @app.get("/")
-def home():
-    return {"status": "DAO Backend Online", "contract": CONTRACT_ADDRESS}
+async def home():
+    return {"status": "DAO Backend Online", "contract": CONTRACT_ADDRESS, "read_cache": cache.stats()}
 
 @app.get("/public/stats")
-def get_global_stats():
+async def get_global_stats():
     """Data Dashboard Umum"""
     try:
-        total_rev = contract.functions.totalRevenue().call()
-        growth_fund = contract.functions.growthFund().call()
-        coffee_price = contract.functions.coffeePrice().call()
-        machine_count = contract.functions.machineCount().call()
-        share_price = contract.functions.sharePrice().call()
-        avail_shares = contract.functions.getAvailableShares().call()
+        # Semua view call dikirim bersamaan, dipatok ke blok yang sama
+        data, block = await reader.read_async({
+            "total_rev": contract.functions.totalRevenue(),
+            "growth_fund": contract.functions.growthFund(),
+            "coffee_price": contract.functions.coffeePrice(),
+            "machine_count": contract.functions.machineCount(),
+            "share_price": contract.functions.sharePrice(),
+            "avail_shares": contract.functions.getAvailableShares(),
+        })
 
         return {
-            "total_revenue_idrt": total_rev / 10**18,
-            "growth_fund_idrt": growth_fund / 10**18,
-            "coffee_price_idrt": coffee_price / 10**18,
-            "share_price_idrt": share_price / 10**18,
-            "machine_count": machine_count,
-            "available_shares": avail_shares / 10**18
+            "total_revenue_idrt": data["total_rev"] / 10**18,
+            "growth_fund_idrt": data["growth_fund"] / 10**18,
+            "coffee_price_idrt": data["coffee_price"] / 10**18,
+            "share_price_idrt": data["share_price"] / 10**18,
+            "machine_count": data["machine_count"],
+            "available_shares": data["avail_shares"] / 10**18,
+            "block_number": block
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/public/machines")
-def get_all_machines():
-    """Peta Sebaran Mesin"""
-    count = contract.functions.machineCount().call()
-    machines = []
-    for i in range(1, count + 1): # Loop dari ID 1
-        m = contract.functions.machines(i).call()
-        machines.append({
-            "id": m[0],
-            "location": m[1],
-            "is_active": m[2],
-            "total_sales": m[3] / 10**18
-        })
-    return machines
+async def get_all_machines(
+    response: Response,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    sort: MachineSort = MachineSort.ID,
+    order: SortOrder = SortOrder.ASC,
+):
+    """
+    Peta Sebaran Mesin (paginasi: offset & limit, sort: id / sales / location).
+    Total mesin dikirim di header X-Total-Count.
+    """
+    try:
+        block = await synced(fleet)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    # Tabel dikunci selama sync berjalan di thread lain -> jangan tunggu di event loop
+    total, rows = await run_in_threadpool(fleet.page, offset, limit, sort.value, descending=order == SortOrder.DESC)
+    response.headers["X-Total-Count"] = str(total)
+    response.headers["X-Block-Number"] = str(block)
+    return [
+        {
+            "id": m["id"],
+            "location": m["location"],
+            "is_active": m["is_active"],
+            "total_sales": m["total_sales"] / 10**18
+        }
+        for m in rows
+    ]
 
 @app.get("/public/proposals")
-def get_proposals():
-    """Melihat Proposal DAO"""
-    count = contract.functions.proposalCount().call()
-    proposals = []
-    for i in range(1, count + 1):
-        # Struct: (id, pType, target, amount, desc, voteCount, executed, endTime)
-        p = contract.functions.proposals(i).call()
-        proposals.append({
-            "id": p[0],
-            "type_code": p[1],
-            "type_name": ProposalType(p[1]).name,
-            "target": p[2],
-            "amount": p[3] / 10**18,
-            "description": p[4],
-            "vote_count": p[5] / 10**18,
-            "executed": p[6],
-            "end_time": p[7]
-        })
-    return proposals
+async def get_proposals(status: Optional[ProposalStatus] = None):
+    """Melihat Proposal DAO (opsional filter status: active / expired / executed)"""
+    try:
+        await synced(proposals)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return [
+        {
+            "id": p["id"],
+            "type_code": p["type_code"],
+            "type_name": ProposalType(p["type_code"]).name,
+            "target": p["target"],
+            "amount": p["amount"] / 10**18,
+            "description": p["description"],
+            "vote_count": p["vote_count"] / 10**18,
+            "executed": p["executed"],
+            "end_time": p["end_time"],
+            "status": p["status"],
+            "quorum_progress": p["quorum_progress"],
+            "voters": [{"address": a, "weight": w / 10**18} for a, w in p["voters"].items()]
+        }
+        for p in await run_in_threadpool(proposals.list, status.value if status else None)
+    ]
+
+@app.get("/tx/{tx_hash}")
+async def get_tx_status(tx_hash: str):
+    """Status transaksi: pending / success / reverted / dropped (masih dicek ulang) / replaced"""
+    if not (tx_hash.startswith("0x") and len(tx_hash) == 66):
+        raise HTTPException(status_code=400, detail="Format tx hash tidak valid")
+    try:
+        status = await run_in_threadpool(receipts.status, tx_hash)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if status is None:
+        raise HTTPException(status_code=404, detail="Transaksi tidak ditemukan")
+    return status
 
 # ================= READ ENDPOINTS (INVESTOR) =================
 
 @app.get("/investor/{address}")
-def get_investor_portfolio(address: str):
+async def get_investor_portfolio(address: str):
     """Data Dashboard Investor"""
     addr = w3.to_checksum_address(address)
     
     # 1. Saldo Saham
     # Backend perlu load AssetToken contract juga untuk cek balanceOf
     # Tapi kita bisa pakai assetToken() address dari main contract
-    asset_token_addr = contract.functions.assetToken().call()
     # (Simplified: Di sini kita asumsi frontend/web3js yang cek saldo token)
-    # Tapi kita bisa cek Dividen:
-    
-    pending_div = contract.functions.getWithdrawableDividend(addr).call()
+    # Tapi kita bisa cek Dividen (keduanya dibaca bersamaan):
+    data, _ = await reader.read_async({
+        "asset_token": contract.functions.assetToken(),
+        "pending_div": contract.functions.getWithdrawableDividend(addr),
+    })
     
     return {
         "address": addr,
-        "token_address": asset_token_addr,
-        "withdrawable_dividend_idrt": pending_div / 10**18
+        "token_address": data["asset_token"],
+        "withdrawable_dividend_idrt": data["pending_div"] / 10**18
+    }
+
+@app.post("/investors/batch")
+async def get_investor_batch(data: InvestorBatchInput):
+    """
+    Portofolio banyak wallet sekaligus. Respons NDJSON (1 baris JSON per wallet),
+    dikirim per chunk begitu selesai dibaca. Semua angka dari blok yang sama
+    (header X-Block-Number, juga ada di setiap baris).
+    """
+    if len(data.addresses) > MAX_BATCH_INVESTORS:
+        raise HTTPException(status_code=400, detail=f"Maksimal {MAX_BATCH_INVESTORS} alamat per request")
+    try:
+        asset_token, payment_token = await get_token_contracts()
+        block = await cache.head_async(aw3)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def rows():
+        supply = None
+        for start in range(0, len(data.addresses), INVESTOR_CHUNK):
+            chunk = data.addresses[start:start + INVESTOR_CHUNK]
+            calls, valid = {}, []
+            for raw in chunk:
+                try:
+                    addr = w3.to_checksum_address(raw)
+                except ValueError:
+                    yield json.dumps({"address": raw, "error": "Alamat tidak valid"}) + "\n"
+                    continue
+                valid.append(addr)
+                calls[("shares", addr)] = asset_token.functions.balanceOf(addr)
+                calls[("dividend", addr)] = contract.functions.getWithdrawableDividend(addr)
+                calls[("idrt", addr)] = payment_token.functions.balanceOf(addr)
+            if supply is None:
+                calls["supply"] = asset_token.functions.totalSupply()
+
+            # Satu batch read per chunk (semua wallet, dipatok ke blok yang sama)
+            try:
+                values, _ = await reader.read_async(calls, block=block)
+            except Exception as e:
+                yield json.dumps({"error": str(e), "block_number": block}) + "\n"
+                return
+            supply = values.get("supply", supply)
+
+            for addr in valid:
+                shares = values[("shares", addr)]
+                yield json.dumps({
+                    "address": addr,
+                    "shares": shares / 10**18,
+                    "share_of_supply_pct": shares * 100 / supply if supply else 0,
+                    "withdrawable_dividend_idrt": values[("dividend", addr)] / 10**18,
+                    "idrt_balance": values[("idrt", addr)] / 10**18,
+                    "block_number": block
+                }) + "\n"
+
+    return StreamingResponse(rows(), media_type="application/x-ndjson", headers={"X-Block-Number": str(block)})
+
+@app.get("/public/dividends")
+async def get_dividend_table(reconcile: int = Query(0, ge=0, le=200)):
+    """
+    Cap table: saldo saham & dividen withdrawable SEMUA holder (dari event, tanpa
+    eth_call per investor). `reconcile=N` mencocokkan N holder acak ke chain.
+    """
+    try:
+        block = await synced(dividends)
+        rows = await run_in_threadpool(dividends.cap_table)
+        result = {
+            "block_number": block,
+            "holders": [
+                {
+                    "address": r["address"],
+                    "shares": r["balance"] / 10**18,
+                    "withdrawable_dividend_idrt": r["withdrawable"] / 10**18,
+                    "withdrawn_dividend_idrt": r["withdrawn"] / 10**18
+                }
+                for r in rows if r["balance"] or r["withdrawable"]
+            ],
+            "total_withdrawable_idrt": sum(r["withdrawable"] for r in rows) / 10**18
+        }
+        if reconcile:
+            result["reconciliation"] = await run_in_threadpool(dividends.reconcile, sample=reconcile)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def sales_row(r):
+    """Satu baris rollup (wei) -> IDRT"""
+    return {
+        "cups": r["cups"],
+        "revenue_idrt": r["revenue"] / 10**18,
+        "cogs_idrt": r["cogs"] / 10**18,
+        "dividend_idrt": r["dividend"] / 10**18,
+        "growth_idrt": r["growth"] / 10**18
+    }
+
+@app.get("/public/analytics/sales")
+async def get_sales_series(
+    resolution: Resolution = Resolution.DAY,
+    machine_id: Optional[int] = Query(None, ge=1),
+    start: Optional[int] = Query(None, description="Unix detik, inklusif"),
+    end: Optional[int] = Query(None, description="Unix detik, eksklusif"),
+):
+    """Seri penjualan per jam / hari: satu mesin, atau semua mesin jika machine_id kosong"""
+    try:
+        block = await synced(analytics)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    rows = await run_in_threadpool(analytics.sales, resolution.value, machine_id, start, end)
+    return {
+        "block_number": block,
+        "resolution": resolution.value,
+        "machine_id": machine_id,
+        "buckets": [dict(sales_row(r), bucket=r["bucket"]) for r in rows]
+    }
+
+@app.get("/public/analytics/machines")
+async def get_sales_by_machine(start: Optional[int] = None, end: Optional[int] = None):
+    """Total penjualan per mesin dalam rentang waktu (dari rollup harian)"""
+    try:
+        block = await synced(analytics)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    totals = await run_in_threadpool(analytics.machine_totals, start, end)
+    return {
+        "block_number": block,
+        "machines": [dict(sales_row(r), machine_id=m) for m, r in sorted(totals.items())]
+    }
+
+@app.get("/public/analytics/peak-hours")
+async def get_peak_hours(
+    machine_id: Optional[int] = Query(None, ge=1),
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+):
+    """Jumlah cangkir per jam (0-23, jam lokal): beban puncak mesin"""
+    try:
+        block = await synced(analytics)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    cups = await run_in_threadpool(analytics.peak_hours, machine_id, start, end)
+    return {
+        "block_number": block,
+        "machine_id": machine_id,
+        "hours": [{"hour": h, "cups": n} for h, n in enumerate(cups)]
     }
 
 # ================= WRITE ENDPOINTS (ADMIN ONLY) =================
 # Endpoint ini menggunakan Private Key Server (.env)
 
 @app.post("/admin/add-machine")
-def admin_add_machine(data: MachineInput):
+async def admin_add_machine(data: MachineInput):
     try:
-        tx = send_admin_tx(contract.functions.addMachine(data.location))
+        tx = await send_admin_tx(contract.functions.addMachine(data.location))
         return {"status": "success", "tx_hash": tx}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/admin/create-proposal")
-def admin_create_proposal(data: ProposalInput):
+async def admin_create_proposal(data: ProposalInput):
     """
     Mapping Type:
     0 = BUY_MACHINE
@@ -205,33 +543,50 @@ def admin_create_proposal(data: ProposalInput):
         elif data.p_type == ProposalType.ADD_VENDOR:
             func = contract.functions.proposeAddVendor(target, data.description)
             
-        tx = send_admin_tx(func)
+        tx = await send_admin_tx(func)
         return {"status": "proposal created", "tx_hash": tx}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/admin/execute-proposal/{id}")
-def admin_execute_proposal(id: int):
+async def admin_execute_proposal(id: int):
     try:
-        tx = send_admin_tx(contract.functions.executeProposal(id))
+        tx = await send_admin_tx(contract.functions.executeProposal(id), precheck=True)
         return {"status": "executed", "tx_hash": tx}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.post("/admin/speed-up/{tx_hash}")
+async def admin_speed_up(tx_hash: str):
+    """Replace-by-fee: kirim ulang tx admin yang macet / dropped (nonce sama, fee lebih tinggi)"""
+    sent = admin_txs.get(tx_hash.lower())
+    if sent is None:
+        raise HTTPException(status_code=404, detail="Transaksi admin tidak ditemukan")
+    status = await run_in_threadpool(receipts.status, tx_hash)
+    if status is not None and status["status"] not in (PENDING, DROPPED):
+        raise HTTPException(status_code=400, detail=f"Transaksi sudah {status['status']}")
+    try:
+        tx, info = sent
+        bumped = await fees.bump_async(tx)
+        new_hash = await sign_and_send_admin(bumped, **dict(info, replaces=tx_hash.lower()))
+        return {"status": "replaced", "tx_hash": new_hash, "replaces": tx_hash.lower()}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.post("/admin/set-price")
-def admin_set_price(price: float):
+async def admin_set_price(price: float):
     try:
         wei = int(price * 10**18)
-        tx = send_admin_tx(contract.functions.setCoffeePrice(wei))
+        tx = await send_admin_tx(contract.functions.setCoffeePrice(wei))
         return {"status": "updated", "tx_hash": tx}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/admin/pay-salary")
-def admin_pay_salary(staff_address: str):
+async def admin_pay_salary(staff_address: str):
     try:
         addr = w3.to_checksum_address(staff_address)
-        tx = send_admin_tx(contract.functions.payMonthlySalary(addr))
+        tx = await send_admin_tx(contract.functions.payMonthlySalary(addr), precheck=True)
         return {"status": "paid", "tx_hash": tx}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -241,31 +596,31 @@ def admin_pay_salary(staff_address: str):
 # Endpoint ini hanya untuk testing via Postman/Swagger menggunakan Admin Wallet.
 
 @app.post("/simulate/buy-coffee")
-def simulate_buy_coffee(data: BuyCoffeeInput):
+async def simulate_buy_coffee(data: BuyCoffeeInput):
     """[DEMO] Simulasi beli kopi pakai wallet admin"""
     try:
         # Perlu approve dulu di background jika belum
-        tx = send_admin_tx(contract.functions.buyCoffee(data.machine_id))
+        tx = await send_admin_tx(contract.functions.buyCoffee(data.machine_id))
         return {"status": "coffee ordered", "tx_hash": tx}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/simulate/vote")
-def simulate_vote(data: VoteInput):
+async def simulate_vote(data: VoteInput):
     """[DEMO] Simulasi vote pakai wallet admin"""
     try:
-        tx = send_admin_tx(contract.functions.vote(data.proposal_id))
+        tx = await send_admin_tx(contract.functions.vote(data.proposal_id), precheck=True)
         return {"status": "voted", "tx_hash": tx}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/simulate/buy-shares")
-def simulate_buy_shares(data: BuySharesInput):
+async def simulate_buy_shares(data: BuySharesInput):
     """[DEMO] Simulasi beli saham"""
     # Di real app: Frontend call approve() -> Frontend call buyShares()
     try:
         amount_wei = data.amount_shares * 10**18 
-        tx = send_admin_tx(contract.functions.buyShares(amount_wei))
+        tx = await send_admin_tx(contract.functions.buyShares(amount_wei))
         return {"status": "shares purchased", "tx_hash": tx}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
@@ -3,12 +3,33 @@ from web3 import Web3
 import pandas as pd
 import json
 import time
+import datetime
 import os
+import sys
+import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
+# Modul bersama (dao_core) ada di root repo
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from dao_core.event_store import EventStore, DASHBOARD_EVENTS, query as query_events
+from dao_core.nonce import NonceManager
+from dao_core.receipts import ReceiptTracker, PENDING, SUCCESS, REVERTED
+from dao_core.fees import FeeOracle
+from dao_core.reads import BatchReader
+from dao_core.cache import ReadCache
+from dao_core.fleet import FleetTable
+from dao_core.proposals import ProposalStore
+from dao_core.live import LiveFeed
+from dao_core.analytics import SalesAnalytics
+
 # ==========================================
 # 1. KONFIGURASI & SETUP
 # ==========================================
+# Waktu setup per rerun (ditampilkan di panel Debug sidebar)
+setup_timings = {}
+_rerun_started = time.perf_counter()
+
 st.set_page_config(page_title="Vending DAO Super App", layout="wide", page_icon="☕")
 
 # Load environment variables
@@ -18,15 +39,67 @@ GANACHE_URL = os.getenv("GANACHE_URL")
 CONTRACT_ADDRESS = os.getenv("CONTRACT_ADDRESS")
 PAYMENT_TOKEN_ADDR = os.getenv("PAYMENT_TOKEN_ADDRESS")
 ASSET_TOKEN_ADDR = os.getenv("ASSET_TOKEN_ADDRESS")
+MULTICALL_ADDRESS = os.getenv("MULTICALL_ADDRESS") # Opsional: Multicall3 (1 eth_call untuk semua view)
+
+# Penyimpan event lokal (Parquet, kolom bertipe) untuk Dashboard Explorer
+EVENT_STORE_PATH = os.getenv("EVENT_STORE_PATH", "events_store")
+DEPLOY_BLOCK = int(os.getenv("DEPLOY_BLOCK", "0")) # Blok deploy contract (awal indexing)
+# Event baru masuk store setelah sekian blok (anti reorg). Kosong = default per chain ID
+EVENT_CONFIRMATIONS = int(os.getenv("EVENT_CONFIRMATIONS")) if os.getenv("EVENT_CONFIRMATIONS") else None
+
+# Pool koneksi HTTP ke node, dipakai bersama semua sesi browser
+RPC_POOL_SIZE = int(os.getenv("RPC_POOL_SIZE", "20"))
+RPC_TIMEOUT = float(os.getenv("RPC_TIMEOUT", "30"))
+
+# Dashboard live: 1 thread per proses cek head tiap LIVE_POLL_SECONDS,
+# tiap sesi cek (tanpa RPC) tiap LIVE_CHECK_SECONDS dan rerun hanya jika blok berganti
+LIVE_POLL_SECONDS = float(os.getenv("LIVE_POLL_SECONDS", "1"))
+LIVE_CHECK_SECONDS = float(os.getenv("LIVE_CHECK_SECONDS", "2"))
+EXPLORER_PAGE_SIZES = [25, 50, 100, 200] # Pilihan jumlah baris per halaman Explorer
+ANALYTICS_TZ_HOURS = float(os.getenv("ANALYTICS_TZ_HOURS", "7")) # Jam lokal bucket analitik (WIB)
 
 if not CONTRACT_ADDRESS or not PAYMENT_TOKEN_ADDR:
     st.error("⚠️ Konfigurasi .env belum lengkap! Pastikan address sudah diisi.")
     st.stop()
 
-if "w3" not in st.session_state:
-    st.session_state.w3 = Web3(Web3.HTTPProvider(GANACHE_URL))
-
-w3 = st.session_state.w3
+# Semua resource di bawah dibuat SEKALI per proses (st.cache_resource),
+# bukan per rerun / per sesi browser.
+_t = time.perf_counter()
+
+# Satu Web3 dengan pool koneksi keep-alive untuk semua sesi & komponen
+@st.cache_resource
+def get_web3():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=RPC_POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return Web3(Web3.HTTPProvider(GANACHE_URL, session=session, request_kwargs={"timeout": RPC_TIMEOUT}))
+
+w3 = get_web3()
+setup_timings["Web3"] = time.perf_counter() - _t
+
+# Nonce dibagikan lokal per akun & dipakai bersama semua sesi browser,
+# supaya dua transaksi dari akun yang sama tidak bentrok nonce
+@st.cache_resource
+def get_nonce_manager():
+    return NonceManager(get_web3())
+
+# Receipt dipantau di background (satu batch request per blok baru),
+# jadi halaman tidak perlu menunggu transaksi masuk blok
+@st.cache_resource
+def get_receipt_tracker():
+    return ReceiptTracker(get_web3()).start()
+
+# Gas (estimasi + margin, cache per fungsi) & fee EIP-1559; chain ID dibaca sekali
+@st.cache_resource
+def get_fee_oracle():
+    return FeeOracle(get_web3())
+
+_t = time.perf_counter()
+nonces = get_nonce_manager()
+receipts = get_receipt_tracker()
+fees = get_fee_oracle()
+setup_timings["Nonce, receipt & fee"] = time.perf_counter() - _t
 
 # Load ABI Helper
 def load_abi():
@@ -37,8 +110,50 @@ def load_abi():
         st.error(f"Gagal memuat abi.json: {e}")
         st.stop()
 
-contract_abi = load_abi()
-contract = w3.eth.contract(address=CONTRACT_ADDRESS, abi=contract_abi)
+@st.cache_resource
+def get_contract():
+    """ABI di-parse sekali; objek contract dipakai bersama semua sesi"""
+    contract_abi = load_abi()
+    return contract_abi, get_web3().eth.contract(address=CONTRACT_ADDRESS, abi=contract_abi)
+
+_t = time.perf_counter()
+contract_abi, contract = get_contract()
+setup_timings["Contract"] = time.perf_counter() - _t
+
+# Cache view call per blok, dipakai bersama semua sesi & rerun Streamlit.
+# Selama belum ada blok baru, rerun tidak mengirim request baca ke node.
+@st.cache_resource
+def get_read_cache():
+    return ReadCache(get_web3())
+
+# View call dashboard dibaca sekaligus (batch JSON-RPC / Multicall3) di satu blok
+@st.cache_resource
+def get_batch_reader():
+    return BatchReader(get_web3(), MULTICALL_ADDRESS, cache=get_read_cache())
+
+@st.cache_resource
+def get_event_store():
+    """Satu penyimpan event per proses, dipakai bersama oleh semua sesi browser
+    dan oleh tabel armada / proposal / analitik (satu sweep eth_getLogs)"""
+    return EventStore(w3, contract, path=EVENT_STORE_PATH, start_block=DEPLOY_BLOCK,
+                      confirmations=EVENT_CONFIRMATIONS)
+
+# Tabel armada di memori, dipakai bersama semua sesi (lihat dao_core/fleet.py)
+@st.cache_resource
+def get_fleet_table():
+    return FleetTable(w3, contract, get_batch_reader(), get_event_store())
+
+# Proposal + tally suara dari event, dipakai bersama semua sesi (lihat dao_core/proposals.py)
+@st.cache_resource
+def get_proposal_store():
+    return ProposalStore(w3, contract, get_batch_reader(), get_event_store())
+
+_t = time.perf_counter()
+read_cache = get_read_cache()
+reader = get_batch_reader()
+fleet = get_fleet_table()
+proposal_store = get_proposal_store()
+setup_timings["Cache, reader & tabel"] = time.perf_counter() - _t
 
 # Load Token Contracts (ERC20 Standard)
 ERC20_ABI = [
@@ -48,11 +163,19 @@ ERC20_ABI = [
     {"constant": False, "inputs": [], "name": "mintaUangGratis", "outputs": [], "type": "function"} 
 ]
 
+@st.cache_resource
+def get_token_contracts():
+    return (
+        get_web3().eth.contract(address=PAYMENT_TOKEN_ADDR, abi=ERC20_ABI),
+        get_web3().eth.contract(address=ASSET_TOKEN_ADDR, abi=ERC20_ABI),
+    )
+
+_t = time.perf_counter()
 try:
-    payment_token = w3.eth.contract(address=PAYMENT_TOKEN_ADDR, abi=ERC20_ABI)
-    asset_token = w3.eth.contract(address=ASSET_TOKEN_ADDR, abi=ERC20_ABI)
+    payment_token, asset_token = get_token_contracts()
 except Exception as e:
     st.toast(f"Warning: Gagal load token. Cek alamat di .env", icon="⚠️")
+setup_timings["Token ERC20"] = time.perf_counter() - _t
 
 # ==========================================
 # 2. HELPER FUNCTIONS
@@ -65,211 +188,279 @@ def short_addr(address):
         return f"{address[:6]}...{address[-4:]}"
     return "Unknown"
 
-def send_transaction(func_call, account_addr, private_key, value=0):
-    """Helper untuk mengirim transaksi Write ke Blockchain"""
+def send_transaction(func_call, account_addr, private_key, value=0, precheck=True):
+    """
+    Helper untuk mengirim transaksi Write ke Blockchain.
+    Langsung return tx hash; status akhir (sukses / revert) dipantau
+    ReceiptTracker dan tampil di panel "Status Transaksi" di sidebar.
+    precheck=True: gas selalu diestimasi, jadi revert contract ("Sudah Vote",
+    "Hari ini sudah gajian!", dst.) muncul sebagai ERROR sebelum tx dikirim.
+    """
     try:
-        nonce = w3.eth.get_transaction_count(account_addr)
-        
-        # Build transaction
-        tx_data = func_call.build_transaction({
-            'chainId': 1337, 
-            'gas': 3000000,
-            'gasPrice': w3.to_wei('20', 'gwei'),
-            'nonce': nonce,
-            'from': account_addr,
-            'value': value
-        })
-        
-        # Sign Transaction
-        signed_tx = w3.eth.account.sign_transaction(tx_data, private_key)
-        
-        # --- PERBAIKAN DI SINI ---
-        # Ganti .rawTransaction menjadi .raw_transaction (snake_case)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-        
-        # Wait for receipt
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+        with nonces.reserve(account_addr) as nonce:
+            # Build transaction (gas & fee dari FeeOracle)
+            tx_data = fees.build(func_call, account_addr, nonce, value=value, precheck=precheck)
+            
+            # Sign Transaction
+            signed_tx = w3.eth.account.sign_transaction(tx_data, private_key)
+            
+            # --- PERBAIKAN DI SINI ---
+            # Ganti .rawTransaction menjadi .raw_transaction (snake_case)
+            tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
         
-        if receipt.status == 1:
-            return w3.to_hex(tx_hash)
-        else:
-            return "ERROR: Transaksi Revert (Gagal)"
+        # Lacak receipt di background (tidak memblokir halaman)
+        tx_hash = w3.to_hex(tx_hash)
+        receipts.track(tx_hash)
+        st.session_state.setdefault("tx_history", []).insert(0, tx_hash)
+        return tx_hash
             
     except Exception as e:
         return f"ERROR: {str(e)}"
 
-def check_and_approve(token_contract, owner_addr, spender_addr, amount_wei, private_key):
+def show_submitted(action, tx_hash):
+    """Tx baru terkirim (belum masuk blok): status akhir dipantau panel Status Transaksi"""
+    st.info(f"⏳ {action} terkirim, menunggu konfirmasi. Hash: {tx_hash}\n\n"
+            "Hasil akhir (sukses / gagal) tampil di panel 🧾 Status Transaksi di sidebar.")
+
+def send_with_approval(token_contract, amount_wei, func_call, owner_addr, private_key, action):
     """
     KEAMANAN: Cek allowance dan approve HANYA SEJUMLAH yang dibutuhkan (Exact Amount).
+    Tidak menunggu approve masuk blok: tx aksi diantrekan di sesi ini dan
+    dikirim otomatis oleh panel Status Transaksi begitu approve sukses
+    (gas aksi baru bisa diestimasi setelah allowance baru ada di chain).
     """
     try:
-        allowance = token_contract.functions.allowance(owner_addr, spender_addr).call()
-        
-        if allowance < amount_wei:
-            st.info(f"🔒 Keamanan: Meminta izin akses token sebesar {amount_wei/10**18:,.0f}...")
-            with st.spinner("⏳ Sedang memproses Approval..."):
-                # APPROVE EXACT AMOUNT ONLY
-                tx_hash = send_transaction(
-                    token_contract.functions.approve(spender_addr, amount_wei), 
-                    owner_addr, private_key
-                )
-                
-                if "ERROR" in tx_hash:
-                    st.error(tx_hash)
-                    return False
-                
-                st.toast("✅ Izin Diberikan (Approve Success)!", icon="🔐")
-                time.sleep(2) # Jeda agar blockchain sync
-                
-        return True 
+        allowance = token_contract.functions.allowance(owner_addr, CONTRACT_ADDRESS).call()
     except Exception as e:
         st.error(f"Gagal Cek Allowance: {e}")
-        return False
+        return
+
+    if allowance >= amount_wei:
+        tx = send_transaction(func_call, owner_addr, private_key)
+        if "ERROR" in tx: st.error(tx)
+        else: show_submitted(action, tx)
+        return
+
+    st.info(f"🔒 Keamanan: Meminta izin akses token sebesar {amount_wei/10**18:,.0f}...")
+    # APPROVE EXACT AMOUNT ONLY
+    tx_hash = send_transaction(
+        token_contract.functions.approve(CONTRACT_ADDRESS, amount_wei),
+        owner_addr, private_key, precheck=False
+    )
+    if "ERROR" in tx_hash:
+        st.error(tx_hash)
+        return
+
+    st.session_state.setdefault("queued_txs", []).append({
+        "approve": tx_hash, "func": func_call, "owner": owner_addr,
+        "private_key": private_key, "action": action,
+    })
+    st.info(f"⏳ Approve terkirim ({short_addr(tx_hash)}). {action} dikirim otomatis setelah approve "
+            "masuk blok; pantau di panel 🧾 Status Transaksi di sidebar.")
 
 # ==========================================
 # 3. FUNGSI BACA DATA
 # ==========================================
-def get_financial_data():
-    try:
-        revenue = contract.functions.totalRevenue().call()
-        growth_fund = contract.functions.growthFund().call()
-        reserve = contract.functions.getOperationalReserve().call()
-        
-        # Ambil data Dividen
-        div_distributed = contract.functions.totalDividendsDistributed().call()
-        div_claimed = contract.functions.totalDividendsClaimed().call()
-        
-        # Hitung Selisih (Unclaimed)
-        div_unclaimed = div_distributed - div_claimed
-        
-        return {
-            "Total Omzet": fmt_rupiah(revenue),
-            "Growth Fund": fmt_rupiah(growth_fund),
-            "Kas Operasional": fmt_rupiah(reserve),
-            "Total Dividen": fmt_rupiah(div_distributed),
-            "Unclaimed Dividen": fmt_rupiah(div_unclaimed) # <--- Data Baru
-        }
-    except:
-        return {
-            "Total Omzet": "0", "Growth Fund": "0", 
-            "Kas Operasional": "0", "Total Dividen": "0",
-            "Unclaimed Dividen": "0"
-        }
-
-def get_all_events():
-    events_list = []
-    
+def financial_calls():
+    """5 view call keuangan dashboard (dibaca dalam 1 round-trip, blok yang sama)"""
+    return {
+        "revenue": contract.functions.totalRevenue(),
+        "growth_fund": contract.functions.growthFund(),
+        "reserve": contract.functions.getOperationalReserve(),
+        "div_distributed": contract.functions.totalDividendsDistributed(),
+        "div_claimed": contract.functions.totalDividendsClaimed(),
+    }
+
+def fmt_delta(delta_wei):
+    """Selisih metrik untuk st.metric (None jika tidak berubah)"""
+    if not delta_wei:
+        return None
+    return f"{'+' if delta_wei > 0 else '-'}Rp {fmt_rupiah(abs(delta_wei))}"
+
+def get_financial_data(data, deltas):
+    """Metrik keuangan (wei) -> {label: (nilai, delta di blok terakhir yang berubah)}"""
+    if not data:
+        return {label: ("0", None) for label in ["Total Omzet", "Growth Fund", "Kas Operasional", "Total Dividen", "Unclaimed Dividen"]}
+
+    # Hitung Selisih (Unclaimed)
+    div_unclaimed = data["div_distributed"] - data["div_claimed"]
+    unclaimed_delta = deltas.get("div_distributed", 0) - deltas.get("div_claimed", 0)
+
+    return {
+        "Total Omzet": (fmt_rupiah(data["revenue"]), fmt_delta(deltas.get("revenue"))),
+        "Growth Fund": (fmt_rupiah(data["growth_fund"]), fmt_delta(deltas.get("growth_fund"))),
+        "Kas Operasional": (fmt_rupiah(data["reserve"]), fmt_delta(deltas.get("reserve"))),
+        "Total Dividen": (fmt_rupiah(data["div_distributed"]), fmt_delta(deltas.get("div_distributed"))),
+        "Unclaimed Dividen": (fmt_rupiah(div_unclaimed), fmt_delta(unclaimed_delta)) # <--- Data Baru
+    }
+
+def describe_event(e):
+    """Ubah satu baris event (kolom bertipe) menjadi (Aktivitas, Detail, Pelaku) untuk tabel Explorer"""
+    name = e['event']
+
     # 1. Jualan
-    for e in contract.events.CoffeeOrdered.create_filter(from_block=0).get_all_entries():
-        events_list.append({
-            "Block": e['blockNumber'], "LogIndex": e['logIndex'],
-            "Aktivitas": "☕ JUALAN KOPI",
-            "Detail": f"Mesin #{e['args']['machineId']} | +Rp {fmt_rupiah(e['args']['amount'])}",
-            "Pelaku": short_addr(e['args']['buyer'])
-        })
+    if name == "CoffeeOrdered":
+        return ("☕ JUALAN KOPI",
+                f"Mesin #{e['machine_id']} | +Rp {fmt_rupiah(e['amount'])}",
+                short_addr(e['actor']))
     # 2. Expense
-    for e in contract.events.ExpensePaid.create_filter(from_block=0).get_all_entries():
-        events_list.append({
-            "Block": e['blockNumber'], "LogIndex": e['logIndex'],
-            "Aktivitas": f"💸 KELUAR: {e['args']['category']}", 
-            "Detail": f"Note: {e['args']['note']} | -Rp {fmt_rupiah(e['args']['amount'])}",
-            "Pelaku": f"To: {short_addr(e['args']['to'])}"
-        })
+    if name == "ExpensePaid":
+        return (f"💸 KELUAR: {e['label']}",
+                f"Note: {e['note']} | -Rp {fmt_rupiah(e['amount'])}",
+                f"To: {short_addr(e['counterparty'])}")
     # 3. IPO
-    for e in contract.events.SharesPurchased.create_filter(from_block=0).get_all_entries():
-        events_list.append({
-            "Block": e['blockNumber'], "LogIndex": e['logIndex'],
-            "Aktivitas": "📈 BELI SAHAM (IPO)",
-            "Detail": f"Beli: {e['args']['amount']/10**18:,.0f} Lembar",
-            "Pelaku": short_addr(e['args']['investor'])
-        })
+    if name == "SharesPurchased":
+        return ("📈 BELI SAHAM (IPO)",
+                f"Beli: {e['amount']/10**18:,.0f} Lembar",
+                short_addr(e['actor']))
     # 4. Transfer
-    for e in contract.events.ShareTransferred.create_filter(from_block=0).get_all_entries():
-        events_list.append({
-            "Block": e['blockNumber'], "LogIndex": e['logIndex'],
-            "Aktivitas": "🔄 TRANSFER SAHAM",
-            "Detail": f"Jml: {e['args']['amount']/10**18:,.0f} Lembar",
-            "Pelaku": f"{short_addr(e['args']['from'])} -> {short_addr(e['args']['to'])}"
-        })
+    if name == "ShareTransferred":
+        return ("🔄 TRANSFER SAHAM",
+                f"Jml: {e['amount']/10**18:,.0f} Lembar",
+                f"{short_addr(e['actor'])} -> {short_addr(e['counterparty'])}")
     # 5. Claim
-    for e in contract.events.DividendClaimed.create_filter(from_block=0).get_all_entries():
-        events_list.append({
-            "Block": e['blockNumber'], "LogIndex": e['logIndex'],
-            "Aktivitas": "💰 TARIK DIVIDEN",
-            "Detail": f"Cair: Rp {fmt_rupiah(e['args']['amount'])}",
-            "Pelaku": short_addr(e['args']['investor'])
-        })
+    if name == "DividendClaimed":
+        return ("💰 TARIK DIVIDEN",
+                f"Cair: Rp {fmt_rupiah(e['amount'])}",
+                short_addr(e['actor']))
     # 6. Proposal
-    for e in contract.events.ProposalCreated.create_filter(from_block=0).get_all_entries():
-        desc = e['args'].get('desc', e['args'].get('description', '-'))
-        pType = e['args'].get('pType', '-')
-        events_list.append({
-            "Block": e['blockNumber'], "LogIndex": e['logIndex'],
-            "Aktivitas": "🗳️ PROPOSAL BARU",
-            "Detail": f"ID: {e['args']['id']} | {pType} | {desc}",
-            "Pelaku": "DAO"
-        })
+    if name == "ProposalCreated":
+        return ("🗳️ PROPOSAL BARU",
+                f"ID: {e['proposal_id']} | {e['label'] or '-'} | {e['note'] or '-'}",
+                "DAO")
     # 7. Voting
-    for e in contract.events.Voted.create_filter(from_block=0).get_all_entries():
-        events_list.append({
-            "Block": e['blockNumber'], "LogIndex": e['logIndex'],
-            "Aktivitas": "✋ VOTING MASUK",
-            "Detail": f"Vote Proposal #{e['args']['proposalId']} | Power: {e['args']['weight']/10**18:,.0f}",
-            "Pelaku": short_addr(e['args']['voter'])
-        })
+    if name == "Voted":
+        return ("✋ VOTING MASUK",
+                f"Vote Proposal #{e['proposal_id']} | Power: {e['amount']/10**18:,.0f}",
+                short_addr(e['actor']))
     # 8. Executed
-    for e in contract.events.ProposalExecuted.create_filter(from_block=0).get_all_entries():
-        events_list.append({
-            "Block": e['blockNumber'], "LogIndex": e['logIndex'],
-            "Aktivitas": "✅ PROPOSAL DEAL",
-            "Detail": f"Proposal ID #{e['args']['id']} Berhasil Dieksekusi",
-            "Pelaku": "System Auto"
-        })
+    if name == "ProposalExecuted":
+        return ("✅ PROPOSAL DEAL",
+                f"Proposal ID #{e['proposal_id']} Berhasil Dieksekusi",
+                "System Auto")
     # 9. Profit
-    for e in contract.events.ProfitDistributed.create_filter(from_block=0).get_all_entries():
-        events_list.append({
-            "Block": e['blockNumber'], "LogIndex": e['logIndex'],
-            "Aktivitas": "📊 BAGI HASIL",
-            "Detail": f"Div: Rp {fmt_rupiah(e['args']['dividendAmount'])} | Growth: Rp {fmt_rupiah(e['args']['growthAmount'])}",
-            "Pelaku": "System"
+    if name == "ProfitDistributed":
+        return ("📊 BAGI HASIL",
+                f"Div: Rp {fmt_rupiah(e['amount'])} | Growth: Rp {fmt_rupiah(e['amount_2'])}",
+                "System")
+    return (name, "-", "-")
+
+def format_events(events):
+    """Baris event (list dict bertipe, terbaru dulu) -> DataFrame tampilan Explorer"""
+    rows = []
+    for e in events:
+        aktivitas, detail, pelaku = describe_event(e)
+        rows.append({
+            "Block": e['block'], "LogIndex": e['log_index'],
+            "Aktivitas": aktivitas,
+            "Detail": detail,
+            "Pelaku": pelaku
         })
+    return pd.DataFrame(rows)
 
-    df = pd.DataFrame(events_list)
-    if not df.empty:
-        df = df.sort_values(by=['Block', 'LogIndex'], ascending=[False, False])
-    return df
+@st.cache_resource
+def get_live_feed():
+    """
+    Satu feed per proses: hanya saat head berganti, event baru & metrik
+    diambil lalu dibagikan ke semua sesi (lihat dao_core/live.py)
+    """
+    feed = LiveFeed(w3, get_event_store(), reader, financial_calls(), poll_interval=LIVE_POLL_SECONDS)
+    try:
+        feed.refresh()
+    except Exception as e:
+        feed.error = str(e)
+    return feed.start()
+
+# Hanya satu halaman event yang difilter & diformat. Kuncinya nomor blok +
+# filter + halaman; `_events` (tabel Arrow) tidak di-hash. cache_data:
+# setiap rerun mendapat salinan DataFrame sendiri (aman diubah per sesi).
+@st.cache_data(max_entries=64)
+def get_event_page(version, _events, event_names, machine_id, address, from_block, to_block, page_no, page_size):
+    total, rows = query_events(
+        _events, event_names=list(event_names), machine_id=machine_id, address=address,
+        from_block=from_block, to_block=to_block, offset=(page_no - 1) * page_size, limit=page_size
+    )
+    return total, format_events(rows)
+
+def explorer_filters():
+    """Input filter Explorer -> argumen query (None = tidak difilter)"""
+    with st.expander("🔎 Filter Aktivitas"):
+        c1, c2 = st.columns(2)
+        event_names = c1.multiselect("Jenis Event", DASHBOARD_EVENTS)
+        address = c2.text_input("Alamat (pelaku / penerima)", placeholder="0x...").strip()
+        c3, c4, c5 = st.columns(3)
+        machine_id = c3.number_input("ID Mesin (0 = semua)", min_value=0, value=0)
+        from_block = c4.number_input("Dari Blok (0 = awal)", min_value=0, value=0)
+        to_block = c5.number_input("Sampai Blok (0 = terbaru)", min_value=0, value=0)
+
+    if address and not Web3.is_address(address):
+        st.warning("Alamat tidak valid, filter alamat diabaikan.")
+        address = ""
+    return (
+        tuple(event_names),
+        int(machine_id) or None,
+        Web3.to_checksum_address(address) if address else None,
+        int(from_block) or None,
+        int(to_block) or None,
+    )
+
+@st.fragment(run_every=LIVE_CHECK_SECONDS)
+def live_status(rendered_version):
+    """Cek ringan berkala (memori saja, tanpa RPC): rerun halaman hanya jika head berganti"""
+    feed = get_live_feed()
+    if feed.version != rendered_version:
+        st.rerun()
+    if feed.error:
+        st.error(f"Gagal terhubung ke Ganache: {feed.error}")
+    else:
+        st.caption(f"Status: 🟢 Live — blok #{rendered_version}")
 
-# ==========================================
-# 4. HALAMAN DASHBOARD (EXPLORER)
-# ==========================================
 def page_dashboard():
     st.title("🤖 Vending Machine DAO Dashboard")
     st.markdown("Monitor transparansi keuangan & operasional blockchain secara Real-Time.")
 
-    if w3.is_connected():
-        st.caption(f"Status: 🟢 Terhubung ke Blockchain")
-    else:
-        st.error("Gagal terhubung ke Ganache.")
+    feed = get_live_feed()
+    version, metrics, deltas, events = feed.snapshot()
+    live_status(version)
 
     # --- UPDATE DISINI (JADI 5 KOLOM) ---
     col1, col2, col3, col4, col5 = st.columns(5)
     
-    fin = get_financial_data()
+    fin = get_financial_data(metrics, deltas)
     
-    col1.metric("Total Omzet", f"Rp {fin['Total Omzet']}")
-    col2.metric("Growth Fund", f"Rp {fin['Growth Fund']}")
-    col3.metric("Kas Operasional", f"Rp {fin['Kas Operasional']}")
-    col4.metric("Total Dividen", f"Rp {fin['Total Dividen']}")
+    col1.metric("Total Omzet", f"Rp {fin['Total Omzet'][0]}", fin['Total Omzet'][1])
+    col2.metric("Growth Fund", f"Rp {fin['Growth Fund'][0]}", fin['Growth Fund'][1])
+    col3.metric("Kas Operasional", f"Rp {fin['Kas Operasional'][0]}", fin['Kas Operasional'][1])
+    col4.metric("Total Dividen", f"Rp {fin['Total Dividen'][0]}", fin['Total Dividen'][1])
     
     # Metrik Baru: Saldo Dividen Mengendap
-    col5.metric("Unclaimed Dividen", f"Rp {fin['Unclaimed Dividen']}") 
+    col5.metric("Unclaimed Dividen", f"Rp {fin['Unclaimed Dividen'][0]}", fin['Unclaimed Dividen'][1]) 
 
     st.divider()
 
     if st.button("🔄 Refresh Manual"):
         st.rerun()
 
-    df_events = get_all_events()
+    filters = explorer_filters()
+    c1, c2 = st.columns([1, 3])
+    page_size = c1.selectbox("Baris per halaman", EXPLORER_PAGE_SIZES, index=1)
+    page_key = "explorer_page"
+    if st.session_state.get("explorer_filters") != (filters, page_size):
+        # Filter berubah -> kembali ke halaman 1
+        st.session_state["explorer_filters"] = (filters, page_size)
+        st.session_state[page_key] = 1
+
+    # Nilai widget halaman (di bawah) sudah ada di session_state saat rerun
+    _t = time.perf_counter()
+    page_no = st.session_state.get(page_key, 1)
+    total, df_events = get_event_page(version, events, *filters, page_no, page_size)
+    n_pages = max((total - 1) // page_size + 1, 1)
+    if page_no > n_pages:
+        page_no = st.session_state[page_key] = n_pages
+        total, df_events = get_event_page(version, events, *filters, page_no, page_size)
+    query_ms = (time.perf_counter() - _t) * 1000
+    c2.number_input(f"Halaman (1-{n_pages})", min_value=1, max_value=n_pages, key=page_key)
+
     if not df_events.empty:
         st.dataframe(
             df_events, 
@@ -280,11 +471,11 @@ def page_dashboard():
             },
             hide_index=True
         )
+        st.caption(f"{total:,} aktivitas cocok | halaman {page_no}/{n_pages} | query + format {query_ms:.1f} ms")
+    elif any(filters):
+        st.info("Tidak ada aktivitas yang cocok dengan filter.")
     else:
         st.info("Belum ada aktivitas.")
-    
-    time.sleep(5)
-    st.rerun()
 
 # ==========================================
 # 5. HALAMAN INVESTOR (TRANSAKSI)
@@ -308,10 +499,16 @@ def page_investor():
         return
 
     try:
-        my_shares = asset_token.functions.balanceOf(my_addr).call()
-        my_div = contract.functions.getWithdrawableDividend(my_addr).call()
-        my_idrt = payment_token.functions.balanceOf(my_addr).call()
-        share_price = contract.functions.sharePrice().call()
+        data, _ = reader.read({
+            "shares": asset_token.functions.balanceOf(my_addr),
+            "div": contract.functions.getWithdrawableDividend(my_addr),
+            "idrt": payment_token.functions.balanceOf(my_addr),
+            "share_price": contract.functions.sharePrice(),
+        })
+        my_shares = data["shares"]
+        my_div = data["div"]
+        my_idrt = data["idrt"]
+        share_price = data["share_price"]
     except Exception as e:
         st.error(f"Gagal ambil data user: {e}")
         return
@@ -324,12 +521,9 @@ def page_investor():
     if my_idrt < 10000 * 10**18:
         if st.button("💸 Minta 100rb IDRT (Faucet)"):
             try:
-                tx = send_transaction(payment_token.functions.mintaUangGratis(), my_addr, pk_investor)
+                tx = send_transaction(payment_token.functions.mintaUangGratis(), my_addr, pk_investor, precheck=False)
                 if "ERROR" in tx: st.error("Faucet gagal.")
-                else: 
-                    st.success(f"Uang masuk! Hash: {tx}")
-                    time.sleep(1)
-                    st.rerun()
+                else: show_submitted("Permintaan faucet", tx)
             except:
                 st.error("Faucet tidak tersedia.")
 
@@ -343,7 +537,7 @@ def page_investor():
         
         # 1. AMBIL DATA STOK TERSEDIA
         try:
-            available_shares_wei = contract.functions.getAvailableShares().call()
+            available_shares_wei = read_cache.call(contract.functions.getAvailableShares())
             available_shares = int(available_shares_wei / 10**18)
             st.info(f"📦 Stok Tersedia: **{available_shares:,.0f} Lembar**")
         except:
@@ -374,13 +568,8 @@ def page_investor():
                 st.error(f"❌ Saldo Wallet Kurang! Butuh Rp {fmt_rupiah(total_cost_wei)}")
             else:
                 # 3. EKSEKUSI
-                if check_and_approve(payment_token, my_addr, CONTRACT_ADDRESS, total_cost_wei, pk_investor):
-                    tx = send_transaction(contract.functions.buyShares(amount_buy_wei), my_addr, pk_investor)
-                    if "ERROR" in tx: st.error(tx)
-                    else: 
-                        st.success(f"Sukses! Hash: {tx}")
-                        time.sleep(2)
-                        st.rerun()
+                send_with_approval(payment_token, total_cost_wei, contract.functions.buyShares(amount_buy_wei),
+                                   my_addr, pk_investor, "Pembelian saham")
 
     # --- KLAIM DIVIDEN ---
     with tab2:
@@ -389,33 +578,34 @@ def page_investor():
             if st.button("💸 Cairkan Semua Dividen"):
                 tx = send_transaction(contract.functions.claimDividends(), my_addr, pk_investor)
                 if "ERROR" in tx: st.error(tx)
-                else: 
-                    st.success(f"Dividen Cair! Hash: {tx}")
-                    time.sleep(2)
-                    st.rerun()
+                else: show_submitted("Klaim dividen", tx)
         else:
             st.info("Belum ada dividen.")
 
     # --- VOTING ---
     with tab3:
         st.subheader("Voting Proposal")
-        p_count = contract.functions.proposalCount().call()
-        active_props = []
-        for i in range(1, p_count + 1):
-            p = contract.functions.proposals(i).call()
-            # p[6] = executed
-            if not p[6]: 
-                # p[4] = description
-                active_props.append(f"ID {p[0]}: {p[4]}")
+        # Hanya proposal aktif (belum eksekusi & belum lewat endTime), dari memori
+        try:
+            proposal_store.sync()
+        except Exception as e:
+            st.error(f"Gagal sinkron data proposal: {e}")
+        active = {p["id"]: p for p in proposal_store.active()}
+        active_props = [f"ID {p['id']}: {p['description']}" for p in active.values()]
 
         if active_props:
             sel = st.selectbox("Pilih Proposal Aktif", active_props)
             p_id = int(sel.split(":")[0].replace("ID ", ""))
+            prop = active[p_id]
+            if prop["quorum_progress"] is not None:
+                st.progress(min(prop["quorum_progress"], 1.0), text=f"Quorum: {prop['quorum_progress']*100:.1f}% ({len(prop['voters'])} pemilih)")
             st.caption("Klik vote, jika suara > 50% proposal otomatis tereksekusi.")
-            if st.button("Vote Setuju"):
+            if my_addr in prop["voters"]:
+                st.info("Anda sudah vote proposal ini.")
+            elif st.button("Vote Setuju"):
                 tx = send_transaction(contract.functions.vote(p_id), my_addr, pk_investor)
                 if "ERROR" in tx: st.error(tx)
-                else: st.success("Vote Masuk!")
+                else: show_submitted("Vote", tx)
         else:
             st.info("Tidak ada proposal aktif.")
 
@@ -428,12 +618,9 @@ def page_investor():
         if st.button("Kirim Saham"):
             amount_trf_wei = int(amount_trf * 10**18)
             
-            # 1. Cek & Approve (Exact Amount) - Approve ke Contract DAO
-            if check_and_approve(asset_token, my_addr, CONTRACT_ADDRESS, amount_trf_wei, pk_investor):
-                # 2. Transaksi
-                tx = send_transaction(contract.functions.transferSaham(to_addr, amount_trf_wei), my_addr, pk_investor)
-                if "ERROR" in tx: st.error(tx)
-                else: st.success(f"Saham Terkirim! Hash: {tx}")
+            # Cek & Approve (Exact Amount) ke Contract DAO, lalu transaksi
+            send_with_approval(asset_token, amount_trf_wei, contract.functions.transferSaham(to_addr, amount_trf_wei),
+                               my_addr, pk_investor, "Transfer saham")
 
 # ==========================================
 # 6. HALAMAN ADMIN (OPERASIONAL)
@@ -451,7 +638,7 @@ def page_admin():
     try:
         account = w3.eth.account.from_key(pk_admin)
         admin_addr = account.address
-        if admin_addr != contract.functions.owner().call():
+        if admin_addr != read_cache.call(contract.functions.owner()):
             st.error("Wallet ini bukan Owner contract!")
             return
         st.sidebar.success(f"Admin: {short_addr(admin_addr)}")
@@ -467,7 +654,7 @@ def page_admin():
         if st.button("Add Machine"):
             tx = send_transaction(contract.functions.addMachine(loc), admin_addr, pk_admin)
             if "ERROR" in tx: st.error(tx)
-            else: st.success(f"Mesin ditambahkan! Hash: {tx}")
+            else: show_submitted("Penambahan mesin", tx)
         
         st.divider()
         st.subheader("Update Ekonomi")
@@ -481,7 +668,7 @@ def page_admin():
                 price_wei = int(np * 10**18)
                 tx = send_transaction(contract.functions.setCoffeePrice(price_wei), admin_addr, pk_admin)
                 if "ERROR" in tx: st.error(tx)
-                else: st.success("Harga Jual Diupdate.")
+                else: show_submitted("Update harga jual", tx)
 
         with col_c:
             nc = st.number_input("Modal HPP (COGS)", value=5000)
@@ -491,7 +678,7 @@ def page_admin():
                 try:
                     tx = send_transaction(contract.functions.setCogs(cogs_wei), admin_addr, pk_admin)
                     if "ERROR" in tx: st.error(tx)
-                    else: st.success("Modal HPP Diupdate.")
+                    else: show_submitted("Update modal HPP", tx)
                 except:
                     st.error("Fungsi setCogs tidak ditemukan di Smart Contract ini.")
 
@@ -516,7 +703,7 @@ def page_admin():
                     checksum_addr = w3.to_checksum_address(clean_addr)
 
                     # 2. CEK LOGIKA GAJI 0
-                    salary = contract.functions.staffSalaries(checksum_addr).call()
+                    salary = read_cache.call(contract.functions.staffSalaries(checksum_addr))
                     if salary == 0:
                         st.error("❌ Gagal: Staff ini belum diset gajinya via Proposal!")
                         st.stop()
@@ -545,8 +732,7 @@ def page_admin():
                             with st.expander("Lihat Detail Error"):
                                 st.code(tx)
                     else: 
-                        st.balloons()
-                        st.success(f"✅ Gaji Harian Terbayar! Hash: {tx}")
+                        show_submitted("Pembayaran gaji harian", tx)
                         
                 except Exception as e:
                     st.error(f"Terjadi kesalahan sistem: {e}")
@@ -574,14 +760,15 @@ def page_admin():
             if func:
                 tx = send_transaction(func, admin_addr, pk_admin)
                 if "ERROR" in tx: st.error(tx)
-                else: st.success(f"Proposal dibuat! Hash: {tx}")
+                else: show_submitted("Proposal", tx)
 
     with t4:
         st.subheader("📍 Status Armada Vending Machine")
         
-        # 1. Cek Total Mesin
+        # 1. Sinkron tabel armada (hanya mesin baru + penjualan baru yang diambil)
         try:
-            m_count = contract.functions.machineCount().call()
+            fleet.sync()
+            m_count = len(fleet.machines)
         except:
             st.error("Gagal mengambil data mesin.")
             m_count = 0
@@ -589,17 +776,23 @@ def page_admin():
         if m_count > 0:
             st.caption(f"Total Mesin Terdaftar: **{m_count} Unit**")
             
-            # 2. Loop Data Mesin
+            # 2. Sorting & paginasi dari memori
+            sort_options = {"ID Mesin": "id", "Total Penjualan": "sales", "Lokasi": "location"}
+            c1, c2, c3 = st.columns(3)
+            sort_label = c1.selectbox("Urutkan", list(sort_options))
+            descending = c2.checkbox("Terbesar dulu", value=sort_label == "Total Penjualan")
+            page_size = 50
+            n_pages = (m_count - 1) // page_size + 1
+            page_no = c3.number_input(f"Halaman (1-{n_pages})", min_value=1, max_value=n_pages, value=1)
+
+            _, rows = fleet.page((page_no - 1) * page_size, page_size, sort_options[sort_label], descending)
             machine_list = []
-            for i in range(1, m_count + 1):
-                # Struct: (id, location, isActive, totalSales)
-                m = contract.functions.machines(i).call()
-                
+            for m in rows:
                 machine_list.append({
-                    "ID": m[0],
-                    "Lokasi": m[1],
+                    "ID": m["id"],
+                    "Lokasi": m["location"],
                     # Kolom Status dihapus sesuai request
-                    "Total Omzet": f"Rp {fmt_rupiah(m[3])}"
+                    "Total Omzet": f"Rp {fmt_rupiah(m['total_sales'])}"
                 })
             
             # 3. Tampilkan Tabel
@@ -631,7 +824,7 @@ def page_simulation():
     mid = st.number_input("ID Mesin", min_value=1, value=1)
     
     try:
-        price_wei = contract.functions.coffeePrice().call()
+        price_wei = read_cache.call(contract.functions.coffeePrice())
         st.info(f"Harga: **Rp {fmt_rupiah(price_wei)}**")
     except:
         st.warning("Gagal ambil harga.")
@@ -648,22 +841,148 @@ def page_simulation():
             
             with st.spinner("Processing Payment..."):
                 # Cek & Approve (Exact Amount)
-                if check_and_approve(payment_token, buyer_addr, CONTRACT_ADDRESS, price_wei, pk_buyer):
-                    tx = send_transaction(contract.functions.buyCoffee(mid), buyer_addr, pk_buyer)
-                    if "ERROR" in tx: st.error(tx)
-                    else: 
-                        st.balloons()
-                        st.success(f"Kopi Keluar! Hash: {tx}")
+                send_with_approval(payment_token, price_wei, contract.functions.buyCoffee(mid),
+                                   buyer_addr, pk_buyer, "Pembayaran kopi")
         except Exception as e:
             st.error(f"Error: {e}")
 
+def send_queued_txs():
+    """Kirim tx aksi yang menunggu approve-nya sukses; batalkan jika approve gagal"""
+    waiting = []
+    for item in st.session_state.get("queued_txs", []):
+        status = (receipts.status(item["approve"]) or {"status": PENDING})["status"]
+        if status == PENDING:
+            waiting.append(item)
+        elif status == SUCCESS:
+            tx = send_transaction(item["func"], item["owner"], item["private_key"])
+            if "ERROR" in tx: st.toast(f"{item['action']} gagal dikirim: {tx}", icon="❌")
+            else: st.toast(f"{item['action']} terkirim setelah approve ({short_addr(tx)})", icon="🔐")
+        else:
+            st.toast(f"Approve {status}, {item['action']} dibatalkan.", icon="❌")
+    st.session_state["queued_txs"] = waiting
+
+@st.fragment(run_every=LIVE_CHECK_SECONDS)
+def tx_status_panel():
+    """Status transaksi yang dikirim di sesi ini (diperbarui berkala dari ReceiptTracker, tanpa RPC)"""
+    send_queued_txs()
+    history = st.session_state.get("tx_history", [])[:10]
+    if not history:
+        return
+    icons = {PENDING: "⏳", SUCCESS: "✅", REVERTED: "❌"}
+    st.subheader("🧾 Status Transaksi")
+    for tx_hash in history:
+        info = receipts.status(tx_hash) or {"status": PENDING}
+        block = f" (blok {info['block_number']})" if "block_number" in info else ""
+        st.caption(f"{icons.get(info['status'], '⚠️')} {short_addr(tx_hash)} — {info['status']}{block}")
+    for item in st.session_state.get("queued_txs", []):
+        st.caption(f"🔐 {item['action']} menunggu approve {short_addr(item['approve'])}")
+
+def render_tx_status():
+    """Panel sidebar: status transaksi yang dikirim di sesi ini"""
+    with st.sidebar:
+        tx_status_panel()
+
+def render_debug_panel():
+    """Panel sidebar: waktu setup resource di rerun ini + statistik cache baca"""
+    with st.sidebar.expander("🛠️ Debug"):
+        setup_total = sum(setup_timings.values())
+        st.caption(f"Setup rerun ini: {setup_total * 1000:.2f} ms (s/d navigasi: {(time.perf_counter() - _rerun_started) * 1000:.1f} ms)")
+        st.dataframe(
+            pd.DataFrame([{"Resource": k, "ms": round(v * 1000, 3)} for k, v in setup_timings.items()]),
+            hide_index=True, use_container_width=True
+        )
+        stats = read_cache.stats()
+        hit_rate = f"{stats['hit_rate'] * 100:.0f}%" if stats["hit_rate"] is not None else "-"
+        st.caption(f"Read cache: {stats['hits']} hit / {stats['misses']} miss ({hit_rate}), head blok {stats['head']}")
+        st.caption(f"Round-trip batch read: {reader.round_trips}")
+
+# ==========================================
+# 8. HALAMAN ANALITIK PENJUALAN
+# ==========================================
+@st.cache_resource
+def get_sales_analytics():
+    """Rollup penjualan per jam / hari, satu per proses (lihat dao_core/analytics.py)"""
+    return SalesAnalytics(w3, contract, reader, get_event_store(),
+                          tz_offset=int(ANALYTICS_TZ_HOURS * 3600))
+
+def page_analytics():
+    st.title("📈 Analitik Penjualan")
+    st.markdown("Omzet, HPP & bagi hasil per mesin per jam / hari.")
+
+    analytics = get_sales_analytics()
+    try:
+        block = analytics.sync()
+    except Exception as e:
+        st.error(f"Gagal sinkron data penjualan: {e}")
+        return
+
+    tz = datetime.timezone(datetime.timedelta(hours=ANALYTICS_TZ_HOURS))
+    today = datetime.datetime.now(tz).date()
+    c1, c2, c3 = st.columns(3)
+    date_range = c1.date_input("Periode", (today - datetime.timedelta(days=30), today))
+    resolution = c2.selectbox("Resolusi", ["day", "hour"], format_func=lambda r: "Harian" if r == "day" else "Per Jam")
+    machine_id = c3.number_input("ID Mesin (0 = semua)", min_value=0, value=0)
+    if len(date_range) != 2:
+        st.info("Pilih tanggal awal & akhir periode.")
+        return
+
+    # Rentang [awal hari pertama, awal hari setelah hari terakhir) jam lokal
+    start = int(datetime.datetime.combine(date_range[0], datetime.time(), tz).timestamp())
+    end = int(datetime.datetime.combine(date_range[1] + datetime.timedelta(days=1), datetime.time(), tz).timestamp())
+    machine = int(machine_id) or None
+
+    rows = analytics.sales(resolution, machine, start, end)
+    if not rows:
+        st.info("Belum ada penjualan di periode ini.")
+        return
+
+    df = pd.DataFrame(rows)
+    df["Waktu"] = pd.to_datetime(df["bucket"], unit="s", utc=True).dt.tz_convert(tz)
+    for col, label in [("revenue", "Omzet"), ("cogs", "HPP"), ("dividend", "Dividen"), ("growth", "Growth Fund")]:
+        df[label] = df[col].astype(float) / 10**18
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Total Cangkir", f"{df['cups'].sum():,}")
+    col2.metric("Total Omzet", f"Rp {fmt_rupiah(sum(r['revenue'] for r in rows))}")
+    col3.metric("Total Dividen", f"Rp {fmt_rupiah(sum(r['dividend'] for r in rows))}")
+
+    st.subheader("Omzet, HPP & Bagi Hasil (IDRT)")
+    st.line_chart(df, x="Waktu", y=["Omzet", "HPP", "Dividen", "Growth Fund"])
+    st.subheader("Cangkir Terjual")
+    st.bar_chart(df.rename(columns={"cups": "Cangkir"}), x="Waktu", y="Cangkir")
+
+    st.subheader("Jam Sibuk")
+    peak = analytics.peak_hours(machine, start, end)
+    st.bar_chart(pd.DataFrame({"Jam": range(24), "Cangkir": peak}), x="Jam", y="Cangkir")
+
+    if machine is None:
+        st.subheader("Per Mesin")
+        totals = analytics.machine_totals(start, end)
+        st.dataframe(
+            pd.DataFrame([
+                {
+                    "ID Mesin": m, "Cangkir": t["cups"],
+                    "Omzet": f"Rp {fmt_rupiah(t['revenue'])}",
+                    "HPP": f"Rp {fmt_rupiah(t['cogs'])}",
+                    "Dividen": f"Rp {fmt_rupiah(t['dividend'])}",
+                }
+                for m, t in sorted(totals.items(), key=lambda kv: -kv[1]["revenue"])
+            ]),
+            use_container_width=True, hide_index=True
+        )
+    st.caption(f"Data s/d blok #{block}")
+
 # ==========================================
 # MAIN NAVIGATION
 # ==========================================
-menu = st.sidebar.selectbox("Navigasi", ["🏠 Dashboard Explorer", "💰 Investor Panel", "👮 Admin Panel", "☕ Simulasi Beli"])
+menu = st.sidebar.selectbox("Navigasi", ["🏠 Dashboard Explorer", "📈 Analitik Penjualan", "💰 Investor Panel", "👮 Admin Panel", "☕ Simulasi Beli"])
+render_tx_status()
+render_debug_panel()
 
 if menu == "🏠 Dashboard Explorer":
     page_dashboard()
+elif menu == "📈 Analitik Penjualan":
+    page_analytics()
 elif menu == "💰 Investor Panel":
     page_investor()
 elif menu == "👮 Admin Panel":
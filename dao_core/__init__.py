@@ -0,0 +1,7 @@
+"""
+Modul bersama Vending Machine DAO.
+
+Dipakai oleh Frontend (Streamlit), backend-dao (FastAPI), dan script
+IoT vending-machine.py. Frontend & backend menambahkan root repo ke
+sys.path sebelum import modul ini.
+"""
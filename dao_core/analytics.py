@@ -0,0 +1,153 @@
+import threading
+from bisect import bisect_left
+
+# ================= PENJELASAN =================
+# Analitik penjualan per mesin per jam / hari, tanpa scan ulang log
+# CoffeeOrdered setiap kali ditanya:
+# - event CoffeeOrdered + ProfitDistributed di blok BARU saja yang diambil
+#   dari EventStore bersama (satu sweep eth_getLogs untuk semua komponen,
+#   hanya blok final = head - confirmations, jadi penjualan dari blok yang
+#   kena reorg tidak pernah masuk rollup), lalu digabung dengan timestamp blok,
+# - timestamp dibaca SEKALI per blok (batch eth_getBlockByNumber untuk
+#   semua blok baru yang berisi penjualan, bukan per event),
+# - hasilnya ditambahkan ke rollup bucket jam & hari (per mesin + gabungan).
+#
+# Angka per cangkir (buyCoffee di VendingMachine.sol):
+# - revenue  = amount di CoffeeOrdered (harga saat itu)
+# - dividend / growth = ProfitDistributed di tx yang sama (dipancarkan
+#   tepat sebelum CoffeeOrdered)
+# - cogs     = revenue - (dividend + growth). Tanpa ProfitDistributed
+#   (harga <= COGS) seluruh revenue dihitung COGS. Pembulatan persen di
+#   contract bisa membuat selisih 1 wei per cangkir.
+#
+# Setiap seri (resolusi, mesin) disimpan sebagai list bucket terurut +
+# list baris paralel. Timestamp blok tidak pernah mundur, jadi update cukup
+# append / tambah ke bucket terakhir, dan query rentang = binary search.
+
+HOUR = 3600
+DAY = 86400
+RESOLUTIONS = {"hour": HOUR, "day": DAY}
+
+METRICS = ("cups", "revenue", "cogs", "dividend", "growth")
+
+# Batas bucket mengikuti jam lokal (default WIB, UTC+7)
+DEFAULT_TZ_OFFSET = 7 * HOUR
+
+
+def _int(value):
+    # Respons batch mentah: node asli mengirim hex string
+    return int(value, 16) if isinstance(value, str) else value
+
+
+class SalesAnalytics:
+
+    def __init__(self, w3, contract, reader, events, tz_offset=DEFAULT_TZ_OFFSET, batch_size=500):
+        self.w3 = w3
+        self.contract = contract
+        self.reader = reader
+        self.events = events  # EventStore bersama (event sampai blok final)
+        self.tz_offset = tz_offset
+        self.batch_size = batch_size  # Blok per batch eth_getBlockByNumber
+
+        self.block = None  # Blok terakhir yang sudah masuk rollup
+        # (resolusi, machineId atau None = semua mesin) -> (list bucket, list baris)
+        self.series = {}
+        self._lock = threading.Lock()
+
+    # ---------- SINKRONISASI ----------
+    def sync(self):
+        """Tambahkan penjualan di blok final baru ke rollup. Return nomor blok."""
+        with self._lock:
+            head = self.reader.cache.head() if self.reader.cache is not None else self.w3.eth.block_number
+            block = self.events.confirmed(head)
+            if block < self.events.start_block or (self.block is not None and block <= self.block):
+                return self.block  # Belum ada blok final baru (atau belum ada sama sekali)
+            self.events.sync(head)
+            block = min(block, self.events.last_block())
+
+            rows = self.events.rows(["CoffeeOrdered", "ProfitDistributed"], after_block=self.block, to_block=block)
+            if rows:
+                self._apply(rows)
+            self.block = block
+            return self.block
+
+    def _block_times(self, blocks):
+        """Timestamp setiap blok (sekali per blok, batch JSON-RPC)"""
+        times = {}
+        blocks = sorted(blocks)
+        for i in range(0, len(blocks), self.batch_size):
+            chunk = blocks[i:i + self.batch_size]
+            responses = self.w3.provider.make_batch_request(
+                [("eth_getBlockByNumber", [hex(b), False]) for b in chunk]
+            )
+            for b, response in zip(chunk, responses):
+                times[b] = _int(response["result"]["timestamp"])
+        return times
+
+    def _apply(self, rows):
+        times = self._block_times({r["block"] for r in rows if r["event"] == "CoffeeOrdered"})
+        profit = {}  # tx hash -> (dividend, growth) dari ProfitDistributed
+        for r in rows:
+            if r["event"] == "ProfitDistributed":
+                profit[r["tx_hash"]] = (r["amount"], r["amount_2"])
+                continue
+
+            dividend, growth = profit.pop(r["tx_hash"], (0, 0))
+            revenue = r["amount"]
+            values = (1, revenue, revenue - dividend - growth, dividend, growth)
+            ts = times[r["block"]]
+            for resolution, size in RESOLUTIONS.items():
+                bucket = self._bucket(ts, size)
+                self._add((resolution, r["machine_id"]), bucket, values)
+                self._add((resolution, None), bucket, values)
+
+    def _bucket(self, ts, size):
+        """Awal bucket (unix detik) menurut jam lokal"""
+        return (ts + self.tz_offset) // size * size - self.tz_offset
+
+    def _add(self, key, bucket, values):
+        buckets, rows = self.series.setdefault(key, ([], []))
+        if not buckets or buckets[-1] != bucket:
+            buckets.append(bucket)
+            rows.append([0] * len(METRICS))
+        row = rows[-1]
+        for i, v in enumerate(values):
+            row[i] += v
+
+    # ---------- QUERY ----------
+    def _range(self, key, start, end):
+        """Potongan (bucket, baris) dengan start <= bucket < end"""
+        buckets, rows = self.series.get(key, ([], []))
+        lo = bisect_left(buckets, start) if start is not None else 0
+        hi = bisect_left(buckets, end) if end is not None else len(buckets)
+        return buckets[lo:hi], rows[lo:hi]
+
+    def sales(self, resolution="day", machine_id=None, start=None, end=None):
+        """
+        Seri waktu satu mesin (atau semua mesin jika None) dalam [start, end)
+        unix detik. Return list dict: bucket + METRICS (nominal dalam wei).
+        """
+        with self._lock:
+            buckets, rows = self._range((resolution, machine_id), start, end)
+            return [dict(zip(METRICS, row), bucket=b) for b, row in zip(buckets, rows)]
+
+    def machine_totals(self, start=None, end=None):
+        """Total METRICS per mesin dalam [start, end) (bucket harian). Dict machineId -> dict."""
+        with self._lock:
+            totals = {}
+            for (resolution, machine_id), _ in self.series.items():
+                if resolution != "day" or machine_id is None:
+                    continue
+                _, rows = self._range((resolution, machine_id), start, end)
+                if rows:
+                    totals[machine_id] = dict(zip(METRICS, (sum(col) for col in zip(*rows))))
+            return totals
+
+    def peak_hours(self, machine_id=None, start=None, end=None):
+        """Jumlah cangkir per jam lokal (0-23) dalam [start, end), dari bucket per jam"""
+        cups = [0] * 24
+        with self._lock:
+            buckets, rows = self._range(("hour", machine_id), start, end)
+            for b, row in zip(buckets, rows):
+                cups[(b + self.tz_offset) % DAY // HOUR] += row[0]
+        return cups
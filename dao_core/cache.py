@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import OrderedDict
+
+# ================= PENJELASAN =================
+# Cache hasil view call, kunci = (address, calldata, nomor blok).
+# Nilai on-chain hanya berubah saat ada blok baru, jadi selama head
+# belum berubah, rerun Streamlit / hit API berikutnya dilayani dari
+# memori tanpa request ke node.
+# - Konstanta & nilai yang hanya di-set di constructor (IMMUTABLE_FUNCTIONS)
+#   disimpan selamanya (tanpa nomor blok).
+# - Nilai lain dibuang begitu head baru terlihat.
+# - Ukuran dibatasi dengan LRU; hit/miss dihitung untuk metrik.
+
+# VendingMachineFleet: `constant` + variabel yang hanya di-set di constructor
+IMMUTABLE_FUNCTIONS = frozenset({
+    "REINVEST_RATE", "DIVIDEND_RATE", "MAX_WALLET_PERCENT",
+    "paymentToken", "assetToken", "owner",
+})
+
+
+class ReadCache:
+
+    def __init__(self, w3, maxsize=2048, head_interval=1.0, immutable=IMMUTABLE_FUNCTIONS):
+        self.w3 = w3
+        self.maxsize = maxsize
+        # Head dicek ke node paling sering tiap N detik (dipakai semua read)
+        self.head_interval = head_interval
+        self.immutable = immutable
+
+        self._entries = OrderedDict()  # (address, calldata, block|None) -> nilai
+        self._lock = threading.Lock()
+        self._head = None
+        self._head_at = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ---------- HEAD ----------
+    def head(self):
+        """Nomor blok terbaru (di-cache head_interval detik)"""
+        if self._head is None or time.time() - self._head_at >= self.head_interval:
+            self.observe_head(self.w3.eth.block_number)
+        return self._head
+
+    async def head_async(self, async_w3):
+        """Sama seperti head(), untuk handler async (AsyncWeb3, tanpa blocking)"""
+        if self._head is None or time.time() - self._head_at >= self.head_interval:
+            self.observe_head(await async_w3.eth.block_number)
+        return self._head
+
+    def observe_head(self, block_number):
+        """Catat head baru (dari polling / newHeads). Entri blok lama dibuang."""
+        with self._lock:
+            self._head_at = time.time()
+            if block_number == self._head:
+                return
+            self._head = block_number
+            for key in [k for k in self._entries if k[2] is not None]:
+                del self._entries[key]
+
+    # ---------- CACHE ----------
+    def _key(self, func_call, block):
+        block = None if func_call.fn_name in self.immutable else block
+        return (func_call.address, func_call._encode_transaction_data(), block)
+
+    def get(self, func_call, block):
+        """Return (True, nilai) jika ada di cache, (False, None) jika tidak"""
+        key = self._key(func_call, block)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, func_call, block, value):
+        # Jangan simpan hasil blok lama (head sudah berganti saat request berjalan)
+        if block != self._head and func_call.fn_name not in self.immutable:
+            return
+        with self._lock:
+            self._entries[self._key(func_call, block)] = value
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def call(self, func_call):
+        """Pengganti func_call.call() yang memakai cache"""
+        block = self.head()
+        found, value = self.get(func_call, block)
+        if not found:
+            value = func_call.call(block_identifier=block)
+            self.put(func_call, block, value)
+        return value
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else None,
+            "size": len(self._entries),
+            "evictions": self.evictions,
+            "head": self._head,
+        }
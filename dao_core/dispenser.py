@@ -0,0 +1,85 @@
+import queue
+import threading
+import time
+
+from dao_core.metrics import LatencyStats
+
+# ================= PENJELASAN =================
+# Antrian dispense: listener hanya MEMASUKKAN pesanan ke antrian lalu
+# langsung kembali mendengarkan event. Proses hardware (gelas, giling,
+# tuang) dikerjakan worker terpisah, satu worker per mesin, sehingga
+# polling tidak macet walaupun mesin sedang sibuk menuang kopi.
+
+
+class DispenseQueue:
+    """
+    Antrian pesanan berbatas (bounded) + worker dispenser per mesin.
+    `handler(job)` dipanggil di thread worker untuk setiap pesanan.
+    """
+
+    def __init__(self, handler, machine_ids, maxsize=20):
+        self.handler = handler
+        self.queues = {mid: queue.Queue(maxsize=maxsize) for mid in machine_ids}
+
+        # Metrik backpressure (gabungan semua mesin)
+        self.wait_time = LatencyStats()  # Lama pesanan menunggu di antrian
+        self.max_depth = 0
+        self.full_events = 0  # Berapa kali listener harus menunggu karena antrian penuh
+        self.served = 0  # Pesanan yang selesai dituang
+        self.failed = 0  # Pesanan yang handler-nya error
+
+        # Metrik per mesin (mode gateway)
+        self.machine_stats = {
+            mid: {"served": 0, "failed": 0, "full_events": 0, "max_depth": 0, "wait_time": LatencyStats()}
+            for mid in machine_ids
+        }
+
+    def start(self):
+        for mid in self.queues:
+            threading.Thread(target=self._worker, args=(mid,), daemon=True).start()
+
+    def submit(self, machine_id, job):
+        """
+        Masukkan pesanan ke antrian mesin. Pesanan sudah dibayar, jadi
+        tidak pernah dibuang: jika antrian penuh, listener menunggu
+        (backpressure) dan kejadian ini dihitung di full_events.
+        """
+        q = self.queues[machine_id]
+        stats = self.machine_stats[machine_id]
+        if q.full():
+            self.full_events += 1
+            stats["full_events"] += 1
+        q.put((time.time(), job))
+        self.max_depth = max(self.max_depth, self.depth())
+        stats["max_depth"] = max(stats["max_depth"], q.qsize())
+
+    def depth(self, machine_id=None):
+        """Jumlah pesanan yang sedang antre (satu mesin, atau semua mesin)"""
+        if machine_id is not None:
+            return self.queues[machine_id].qsize()
+        return sum(q.qsize() for q in self.queues.values())
+
+    def join(self):
+        """Tunggu sampai semua antrian kosong (dipakai saat shutdown)"""
+        for q in self.queues.values():
+            q.join()
+
+    def _worker(self, machine_id):
+        q = self.queues[machine_id]
+        stats = self.machine_stats[machine_id]
+        while True:
+            enqueued_at, job = q.get()
+            waited = time.time() - enqueued_at
+            self.wait_time.add(waited)
+            stats["wait_time"].add(waited)
+            try:
+                self.handler(job)
+            except Exception as e:
+                self.failed += 1
+                stats["failed"] += 1
+                print(f"[DISPENSER] Mesin #{machine_id} gagal memproses pesanan: {e}")
+            else:
+                self.served += 1
+                stats["served"] += 1
+            finally:
+                q.task_done()
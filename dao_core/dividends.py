@@ -0,0 +1,164 @@
+import random
+import threading
+
+from dao_core.erc20 import ERC20_READ_ABI
+
+# ================= PENJELASAN =================
+# Mesin dividen off-chain: meniru akuntansi magnifiedDividendPerShare
+# di VendingMachine.sol dengan me-replay event, sehingga dividen yang
+# bisa ditarik SEMUA holder dihitung di memori (tanpa eth_call
+# getWithdrawableDividend per investor).
+#
+# Event dibaca dari EventStore bersama (satu sweep eth_getLogs untuk semua
+# komponen) dan hanya sampai blok final (head - confirmations), jadi event
+# dari blok yang kena reorg tidak pernah di-replay.
+#
+# Event yang di-replay (urut blok & logIndex):
+# - ProfitDistributed -> magnifiedDividendPerShare += dividen * MAGNITUDE / totalSupply
+# - SharesPurchased   -> saldo naik, koreksi -= perShare * jumlah
+# - ShareTransferred  -> saldo pindah, koreksi pengirim += / penerima -=
+# - DividendClaimed   -> withdrawn naik
+#
+# totalSupply saham (MesinShare) tetap 100.000 sejak constructor (tidak
+# ada mint/burn), jadi cukup dibaca sekali. Saldo hanya berubah lewat
+# buyShares/transferSaham; transfer ERC20 langsung di luar DAO tidak
+# terlihat di event ini -> gunakan reconcile() untuk spot-check ke chain.
+#
+# Data per holder disimpan di list paralel (slot per alamat), lalu
+# withdrawable_all() menghitung semua holder dalam satu pass. Angkanya
+# melebihi 256 bit di tengah perhitungan, jadi dipakai int Python (exact)
+# agar hasil identik dengan contract.
+
+MAGNITUDE = 2**128
+
+DIVIDEND_EVENTS = ["ProfitDistributed", "SharesPurchased", "ShareTransferred", "DividendClaimed"]
+
+
+class DividendEngine:
+    """
+    Akuntansi dividen semua holder dalam list paralel (slot per alamat).
+
+    Sengaja TIDAK memakai array numpy: saldo wei (~2^77) x
+    magnifiedDividendPerShare (skala MAGNITUDE = 2^128) mencapai ~2^220,
+    jauh di atas int64/uint64, dan float64 kehilangan presisi (hasil
+    tidak lagi sama persis dengan getWithdrawableDividend). Array object
+    numpy tetap memanggil int Python per elemen, jadi tidak lebih cepat.
+    """
+
+    def __init__(self, w3, contract, reader, events):
+        self.w3 = w3
+        self.contract = contract
+        self.reader = reader
+        self.events = events  # EventStore bersama (event sampai blok final)
+
+        self.magnified_per_share = 0
+        self.total_supply = None
+        self.block = None  # Blok terakhir yang sudah di-replay
+
+        # Slot per holder (list paralel, index = slot)
+        self.slots = {}        # alamat -> slot
+        self.holders = []
+        self.balances = []
+        self.corrections = []  # int (bisa negatif), sama seperti int256 di contract
+        self.withdrawn = []
+        self._lock = threading.Lock()
+
+    def _slot(self, address):
+        slot = self.slots.get(address)
+        if slot is None:
+            slot = self.slots[address] = len(self.holders)
+            self.holders.append(address)
+            self.balances.append(0)
+            self.corrections.append(0)
+            self.withdrawn.append(0)
+        return slot
+
+    def sync(self):
+        """Replay event sampai blok final terbaru. Return nomor blok."""
+        with self._lock:
+            head = self.reader.cache.head() if self.reader.cache is not None else self.w3.eth.block_number
+            block = self.events.confirmed(head)
+            if block < self.events.start_block or (self.block is not None and block <= self.block):
+                return self.block  # Belum ada blok final baru (atau belum ada sama sekali)
+            self.events.sync(head)
+            block = min(block, self.events.last_block())
+
+            if self.total_supply is None:
+                data, _ = self.reader.read({"asset": self.contract.functions.assetToken()}, block=block)
+                asset = self.w3.eth.contract(address=data["asset"], abi=ERC20_READ_ABI)
+                data, _ = self.reader.read({"supply": asset.functions.totalSupply()}, block=block)
+                self.total_supply = data["supply"]
+
+            for row in self.events.rows(DIVIDEND_EVENTS, after_block=self.block, to_block=block):
+                self._apply(row)
+
+            self.block = block
+            return self.block
+
+    def _apply(self, row):
+        """Satu baris event (kolom EventStore) ke akuntansi dividen"""
+        name = row["event"]
+        if name == "ProfitDistributed":
+            self.magnified_per_share += row["amount"] * MAGNITUDE // self.total_supply
+        elif name == "SharesPurchased":
+            i = self._slot(row["actor"])
+            self.balances[i] += row["amount"]
+            self.corrections[i] -= self.magnified_per_share * row["amount"]
+        elif name == "ShareTransferred":
+            src, dst = self._slot(row["actor"]), self._slot(row["counterparty"])
+            corr = self.magnified_per_share * row["amount"]
+            self.balances[src] -= row["amount"]
+            self.balances[dst] += row["amount"]
+            self.corrections[src] += corr
+            self.corrections[dst] -= corr
+        elif name == "DividendClaimed":
+            self.withdrawn[self._slot(row["actor"])] += row["amount"]
+
+    # ---------- QUERY ----------
+    def _withdrawable_all(self):
+        # Satu pass atas list paralel dengan int Python (exact, lihat docstring kelas)
+        per_share = self.magnified_per_share
+        return {
+            holder: max((b * per_share + c) // MAGNITUDE - w, 0) if b else 0
+            for holder, b, c, w in zip(self.holders, self.balances, self.corrections, self.withdrawn)
+        }
+
+    def withdrawable_all(self):
+        """Dict alamat -> dividen yang bisa ditarik (wei), sama dengan getWithdrawableDividend"""
+        with self._lock:
+            return self._withdrawable_all()
+
+    def cap_table(self):
+        """List holder: alamat, saldo saham, dividen withdrawable, total sudah ditarik (wei)"""
+        with self._lock:
+            withdrawable = self._withdrawable_all()
+            return [
+                {"address": h, "balance": b, "withdrawable": withdrawable[h], "withdrawn": w}
+                for h, b, w in zip(self.holders, self.balances, self.withdrawn)
+            ]
+
+    # ---------- REKONSILIASI ----------
+    def reconcile(self, sample=20, addresses=None):
+        """
+        Spot-check ke chain di blok yang sama dengan engine: sampel holder
+        (acak, atau `addresses`) dibaca getWithdrawableDividend dalam 1 batch.
+        Return dict: blok, jumlah dicek, dan daftar selisih.
+        """
+        with self._lock:
+            block = self.block
+            per_share = self.magnified_per_share
+            if addresses is None:
+                addresses = random.sample(self.holders, min(sample, len(self.holders)))
+            withdrawable = self._withdrawable_all()
+
+        calls = {a: self.contract.functions.getWithdrawableDividend(a) for a in addresses}
+        calls["_per_share"] = self.contract.functions.magnifiedDividendPerShare()
+        chain, _ = self.reader.read(calls, block=block)
+
+        mismatches = [
+            {"address": a, "engine": withdrawable.get(a, 0), "chain": chain[a]}
+            for a in addresses if withdrawable.get(a, 0) != chain[a]
+        ]
+        if chain["_per_share"] != per_share:
+            mismatches.append({"address": None, "engine": per_share, "chain": chain["_per_share"]})
+        return {"block": block, "checked": len(addresses), "mismatches": mismatches}
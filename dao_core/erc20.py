@@ -0,0 +1,15 @@
+# ================= PENJELASAN =================
+# Potongan ABI ERC20 (hanya fungsi baca) yang dipakai bersama komponen
+# dao_core & backend: IDRT / $MESIN cukup balanceOf + totalSupply.
+
+BALANCE_OF_ABI = {
+    "name": "balanceOf", "type": "function", "stateMutability": "view",
+    "inputs": [{"name": "account", "type": "address"}], "outputs": [{"name": "", "type": "uint256"}],
+}
+
+TOTAL_SUPPLY_ABI = {
+    "name": "totalSupply", "type": "function", "stateMutability": "view",
+    "inputs": [], "outputs": [{"name": "", "type": "uint256"}],
+}
+
+ERC20_READ_ABI = [BALANCE_OF_ABI, TOTAL_SUPPLY_ABI]
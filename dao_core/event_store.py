@@ -0,0 +1,304 @@
+import json
+import os
+import threading
+from decimal import Decimal
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from dao_core.logs import EventLogReader, LogBackfiller
+
+# ================= PENJELASAN =================
+# Penyimpan event kolomnar (Arrow di memori, Parquet di disk) untuk
+# Dashboard Explorer. Event disimpan dengan kolom bertipe, BUKAN teks
+# yang sudah diformat, jadi bisa difilter, diurutkan & diagregasi:
+# - block / log_index  : integer
+# - event              : kategori (dictionary, urutan DASHBOARD_EVENTS)
+# - alamat & teks      : string
+# - amount / amount_2  : integer wei (decimal128(38, 0), exact)
+# Format Rupiah / alamat pendek dilakukan di UI, hanya untuk baris yang tampil.
+#
+# Setiap sync hanya mengambil blok BARU (last_block + 1 .. head) dengan satu
+# eth_getLogs per chunk (EventLogReader + LogBackfiller), lalu chunk ditulis
+# sebagai file part Parquet baru + checkpoint di _meta.json. Part kecil
+# digabung (compaction) jika jumlahnya melewati MAX_PARTS. Saat start,
+# semua part dibaca langsung jadi satu tabel Arrow.
+#
+# Sync hanya sampai head - confirmations (blok yang dianggap final), jadi
+# event dari blok yang masih bisa kena reorg tidak pernah masuk part /
+# checkpoint. Reorg yang lebih dalam dari `confirmations` tidak ditangani;
+# pilih kedalaman sesuai chain (CONFIRMATIONS_BY_CHAIN).
+#
+# query() mengambil satu halaman (filter + paginasi) dari tabel itu, jadi
+# UI hanya memformat & mengirim baris yang tampil, berapapun panjang histori.
+
+# Event yang ditampilkan di Dashboard Explorer
+DASHBOARD_EVENTS = [
+    "CoffeeOrdered",
+    "ExpensePaid",
+    "SharesPurchased",
+    "ShareTransferred",
+    "DividendClaimed",
+    "ProposalCreated",
+    "Voted",
+    "ProposalExecuted",
+    "ProfitDistributed",
+]
+
+# Argumen event -> kolom tabel
+FIELD_MAP = {
+    "CoffeeOrdered": {"machineId": "machine_id", "buyer": "actor", "amount": "amount"},
+    "ExpensePaid": {"category": "label", "to": "counterparty", "amount": "amount", "note": "note"},
+    "SharesPurchased": {"investor": "actor", "amount": "amount", "cost": "amount_2"},
+    "ShareTransferred": {"from": "actor", "to": "counterparty", "amount": "amount"},
+    "DividendClaimed": {"investor": "actor", "amount": "amount"},
+    "ProposalCreated": {"id": "proposal_id", "pType": "label", "desc": "note"},
+    "Voted": {"proposalId": "proposal_id", "voter": "actor", "weight": "amount"},
+    "ProposalExecuted": {"id": "proposal_id"},
+    "ProfitDistributed": {"dividendAmount": "amount", "growthAmount": "amount_2"},
+}
+
+# Wei dalam decimal 38 digit: cukup untuk nominal token 18 desimal (s/d 10^20 token)
+WEI = pa.decimal128(38, 0)
+
+SCHEMA = pa.schema([
+    ("block", pa.int64()),
+    ("log_index", pa.int32()),
+    ("tx_hash", pa.string()),
+    ("event", pa.dictionary(pa.int8(), pa.string())),
+    ("machine_id", pa.int64()),
+    ("proposal_id", pa.int64()),
+    ("actor", pa.string()),         # Pembeli / investor / voter / pengirim
+    ("counterparty", pa.string()),  # Penerima (transfer saham, expense)
+    ("amount", WEI),                # Nominal utama (IDRT / saham / bobot vote / dividen)
+    ("amount_2", WEI),              # Biaya beli saham / porsi growth fund
+    ("label", pa.string()),         # Kategori expense / tipe proposal
+    ("note", pa.string()),          # Catatan expense / deskripsi proposal
+])
+
+# Kedalaman konfirmasi default per chain ID (sama dengan CHAIN_POLICIES di vending-machine.py)
+CONFIRMATIONS_BY_CHAIN = {
+    1337: 0,    # Ganache lokal (tanpa reorg)
+    137: 32,    # Polygon PoS
+    80002: 12,  # Polygon Amoy (testnet)
+}
+DEFAULT_CONFIRMATIONS = 12
+
+MAX_PARTS = 64
+META_FILE = "_meta.json"
+
+
+def to_table(events, event_names=DASHBOARD_EVENTS):
+    """List event web3 (sudah decode) -> tabel Arrow sesuai SCHEMA"""
+    columns = {field.name: [] for field in SCHEMA}
+    codes = {name: i for i, name in enumerate(event_names)}
+    for e in events:
+        row = dict.fromkeys(columns)
+        row["block"] = e["blockNumber"]
+        row["log_index"] = e["logIndex"]
+        row["tx_hash"] = "0x" + bytes(e["transactionHash"]).hex()
+        row["event"] = codes[e["event"]]
+        for arg, column in FIELD_MAP.get(e["event"], {}).items():
+            value = e["args"][arg]
+            row[column] = Decimal(value) if SCHEMA.field(column).type == WEI else value
+        for name, value in row.items():
+            columns[name].append(value)
+
+    arrays = []
+    for field in SCHEMA:
+        if field.name == "event":
+            arrays.append(pa.DictionaryArray.from_arrays(
+                pa.array(columns["event"], type=pa.int8()), pa.array(event_names)
+            ))
+        else:
+            arrays.append(pa.array(columns[field.name], type=field.type))
+    return pa.Table.from_arrays(arrays, schema=SCHEMA)
+
+
+class EventStore:
+    """
+    Tabel event + checkpoint blok terakhir.
+    Aman dipakai bersama oleh banyak sesi/thread dalam satu proses.
+    """
+
+    def __init__(self, w3, contract, path="events_store", start_block=0, event_names=None, confirmations=None):
+        self.w3 = w3
+        self.contract = contract
+        self.path = path
+        self.start_block = start_block
+        if confirmations is None:
+            confirmations = CONFIRMATIONS_BY_CHAIN.get(w3.eth.chain_id, DEFAULT_CONFIRMATIONS)
+        self.confirmations = confirmations  # Blok di bawah head yang dianggap final
+        self.event_names = event_names or DASHBOARD_EVENTS
+        self.reader = EventLogReader(w3, contract, self.event_names)
+        self.backfiller = LogBackfiller(self.reader.fetch)
+
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self._meta = self._load_meta()
+        self._reset_if_new_contract()
+        self._table = self._load_table()
+
+    # ---------- META ----------
+    def _load_meta(self):
+        try:
+            with open(os.path.join(self.path, META_FILE)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _save_meta(self):
+        tmp = os.path.join(self.path, META_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self._meta, f)
+        os.replace(tmp, os.path.join(self.path, META_FILE))
+
+    def _parts(self):
+        return sorted(f for f in os.listdir(self.path) if f.startswith("part-") and f.endswith(".parquet"))
+
+    def _reset_if_new_contract(self):
+        """Contract di-deploy ulang (alamat beda) -> data lama tidak berlaku lagi."""
+        if self._meta.get("contract") != self.contract.address:
+            for part in self._parts():
+                os.remove(os.path.join(self.path, part))
+            self._meta = {"contract": self.contract.address}
+            self._save_meta()
+
+    def _load_table(self):
+        tables = []
+        covered = self.start_block - 1
+        # Urut blok awal; part hasil compaction (rentang terlebar) lebih dulu
+        for start, end, part in sorted(self._ranges(), key=lambda r: (r[0], -r[1])):
+            if start > self.last_block() or end <= covered:
+                # Ditulis setelah checkpoint terakhir (crash di tengah sync), atau
+                # sisa part lama yang sudah tercakup hasil compaction
+                os.remove(os.path.join(self.path, part))
+                continue
+            tables.append(pq.read_table(os.path.join(self.path, part), schema=SCHEMA))
+            covered = end
+        return pa.concat_tables(tables) if tables else SCHEMA.empty_table()
+
+    def _ranges(self):
+        """(blok awal, blok akhir, nama file) setiap part"""
+        return [(int(p.split("-")[1]), int(p.split("-")[2][:-8]), p) for p in self._parts()]
+
+    def last_block(self):
+        """Blok terakhir yang sudah masuk tabel."""
+        return self._meta.get("last_block", self.start_block - 1)
+
+    def confirmed(self, head):
+        """Blok final terakhir jika head chain = `head`"""
+        return max(head - self.confirmations, self.start_block - 1)
+
+    # ---------- SINKRONISASI ----------
+    def sync(self, head=None):
+        """
+        Ambil event dari (last_block + 1) sampai blok final (head terbaru
+        atau `head`, dikurangi confirmations) lalu simpan. Checkpoint disimpan
+        per chunk, jadi backfill yang terputus bisa dilanjutkan.
+        Return jumlah event baru yang masuk.
+        """
+        with self._lock:
+            if head is None:
+                head = self.w3.eth.block_number
+            head = self.confirmed(head)
+            start = self.last_block() + 1
+            if start > head:
+                return 0
+
+            total = 0
+            for chunk_start, chunk_end, logs in self.backfiller.iter_chunks(start, head):
+                if logs:
+                    table = to_table(logs, self.event_names)
+                    self._write_part(table, chunk_start, chunk_end)
+                    self._table = pa.concat_tables([self._table, table])
+                    total += table.num_rows
+                # Checkpoint ditulis setelah part-nya aman di disk
+                self._meta["last_block"] = chunk_end
+                self._save_meta()
+
+            if len(self._parts()) > MAX_PARTS:
+                self._compact()
+            return total
+
+    def _write_part(self, table, start, end):
+        name = f"part-{start:012d}-{end:012d}.parquet"
+        tmp = os.path.join(self.path, name + ".tmp")
+        pq.write_table(table, tmp)
+        os.replace(tmp, os.path.join(self.path, name))
+
+    def _compact(self):
+        """Gabungkan semua part jadi satu file (isi tabel di memori sudah lengkap)"""
+        old_parts = self._parts()
+        self._table = self._table.combine_chunks()
+        self._write_part(self._table, self.start_block, self.last_block())
+        for part in old_parts:
+            if part != f"part-{self.start_block:012d}-{self.last_block():012d}.parquet":
+                os.remove(os.path.join(self.path, part))
+
+    # ---------- BACA ----------
+    def table(self, after_block=None):
+        """Tabel Arrow semua event (atau blok > `after_block`), urut blok & logIndex naik."""
+        with self._lock:
+            table = self._table
+        if after_block is not None:
+            table = table.filter(pc.greater(table["block"], after_block))
+        return table
+
+    def rows(self, event_names, after_block=None, to_block=None):
+        """
+        Baris event tertentu di blok (after_block, to_block] sebagai list dict,
+        urut blok & logIndex naik; amount / amount_2 dalam int wei.
+        Dipakai komponen yang membangun state dari event (fleet, proposal,
+        dividen, analitik), jadi semuanya membaca SATU sweep yang sama.
+        """
+        with self._lock:
+            table = self._table
+        blocks = table["block"].to_numpy()
+        lo = int(blocks.searchsorted(after_block, "right")) if after_block is not None else 0
+        hi = int(blocks.searchsorted(to_block, "right")) if to_block is not None else len(blocks)
+        table = table.slice(lo, max(hi - lo, 0))
+        table = table.filter(pc.is_in(table["event"], value_set=pa.array(list(event_names))))
+        rows = table.to_pylist()
+        for row in rows:
+            for column in ("amount", "amount_2"):
+                if row[column] is not None:
+                    row[column] = int(row[column])
+        return rows
+
+
+# ================= QUERY HALAMAN =================
+def query(table, event_names=None, machine_id=None, address=None, from_block=None, to_block=None,
+          offset=0, limit=50):
+    """
+    Satu halaman event (terbaru dulu) dari tabel Arrow yang urut blok naik.
+    Filter: jenis event, ID mesin, alamat (actor atau counterparty), rentang blok.
+    Return (jumlah baris yang lolos filter, list dict baris di halaman ini).
+    Hanya baris di halaman yang dikonversi ke Python; rentang blok dipotong
+    dengan binary search, filter lain dijalankan vektor di Arrow.
+    """
+    if from_block is not None or to_block is not None:
+        blocks = table["block"].to_numpy()
+        lo = int(blocks.searchsorted(from_block, "left")) if from_block is not None else 0
+        hi = int(blocks.searchsorted(to_block, "right")) if to_block is not None else len(blocks)
+        table = table.slice(lo, max(hi - lo, 0))
+
+    masks = []
+    if event_names:
+        masks.append(pc.is_in(table["event"], value_set=pa.array(list(event_names))))
+    if machine_id is not None:
+        masks.append(pc.equal(table["machine_id"], machine_id))
+    if address:
+        masks.append(pc.or_kleene(pc.equal(table["actor"], address), pc.equal(table["counterparty"], address)))
+    if masks:
+        mask = masks[0]
+        for m in masks[1:]:
+            mask = pc.and_kleene(mask, m)
+        table = table.filter(mask)
+
+    total = table.num_rows
+    # Tabel urut naik: halaman terbaru-dulu = potongan dari belakang, lalu dibalik
+    end = max(total - offset, 0)
+    start = max(end - limit, 0)
+    return total, table.slice(start, end - start).to_pylist()[::-1]
@@ -0,0 +1,208 @@
+import math
+import threading
+import time
+
+# ================= PENJELASAN =================
+# Oracle gas & fee (EIP-1559) pengganti gas 3.000.000 / 20 gwei / chainId
+# 1337 yang di-hardcode:
+# - chain ID dibaca SEKALI saat start,
+# - gas limit = eth_estimateGas x margin, di-cache per (contract, selector,
+#   panjang calldata) supaya tidak ada estimateGas di setiap transaksi.
+#   Argumen string/bytes yang lebih panjang (lokasi mesin, deskripsi
+#   proposal) = calldata lebih panjang = entri cache sendiri, jadi tidak
+#   memakai gas limit milik argumen yang lebih pendek. Panggilan yang
+#   revert-nya dipakai sebagai pesan ke user (precheck) selalu diestimasi,
+# - fee = base fee blok berikutnya + persentil priority fee beberapa blok
+#   terakhir (eth_feeHistory), di-refresh berkala,
+# - bump() untuk replace-by-fee transaksi yang macet.
+# Chain tanpa EIP-1559 otomatis memakai gasPrice (legacy).
+# Versi *_async memakai AsyncWeb3 (`async_w3`) dengan cache yang sama,
+# untuk server async (FastAPI) tanpa thread pool.
+
+
+class FeeOracle:
+
+    def __init__(self, w3, gas_margin=1.2, gas_ttl=600, history_blocks=20,
+                 reward_percentile=50, refresh_seconds=15, min_priority_fee=10**9,
+                 base_fee_multiplier=2, async_w3=None):
+        self.w3 = w3
+        self.async_w3 = async_w3
+        self.chain_id = w3.eth.chain_id
+        self.gas_margin = gas_margin
+        self.gas_ttl = gas_ttl
+        self.history_blocks = history_blocks
+        self.reward_percentile = reward_percentile
+        self.refresh_seconds = refresh_seconds
+        self.min_priority_fee = min_priority_fee
+        # maxFee = base x multiplier + priority: tahan beberapa blok base fee naik
+        self.base_fee_multiplier = base_fee_multiplier
+
+        self._gas = {}   # (to, selector) -> (gas limit, waktu estimasi)
+        self._fees = None
+        self._fees_at = 0
+        self._lock = threading.Lock()
+        self.estimates = 0
+
+    # ---------- GAS LIMIT ----------
+    def gas_limit(self, tx, cache=True):
+        """
+        Gas limit untuk tx (dict dengan to, data, from, value).
+        cache=False: selalu eth_estimateGas, jadi tx yang akan revert
+        gagal di sini (dengan alasan revert) sebelum dikirim.
+        """
+        cached = self._cached_gas(tx) if cache else None
+        if cached is not None:
+            return cached
+        estimate = self.w3.eth.estimate_gas(self._estimate_params(tx))
+        return self._store_gas(tx, estimate, cache)
+
+    async def gas_limit_async(self, tx, cache=True):
+        cached = self._cached_gas(tx) if cache else None
+        if cached is not None:
+            return cached
+        estimate = await self.async_w3.eth.estimate_gas(self._estimate_params(tx))
+        return self._store_gas(tx, estimate, cache)
+
+    @staticmethod
+    def _gas_key(tx):
+        data = tx.get("data") or "0x"
+        return (tx.get("to"), data[:10], len(data))
+
+    @staticmethod
+    def _estimate_params(tx):
+        return {k: v for k, v in tx.items() if k in ("from", "to", "data", "value")}
+
+    def _cached_gas(self, tx):
+        with self._lock:
+            cached = self._gas.get(self._gas_key(tx))
+        if cached is not None and time.time() - cached[1] < self.gas_ttl:
+            return cached[0]
+        return None
+
+    def _store_gas(self, tx, estimate, cache):
+        self.estimates += 1
+        gas = math.ceil(estimate * self.gas_margin)
+        if not cache:
+            return gas
+        key = self._gas_key(tx)
+        with self._lock:
+            cached = self._gas.get(key)
+            # Argumen berbeda bisa butuh gas berbeda: simpan yang terbesar
+            if cached is not None and time.time() - cached[1] < self.gas_ttl:
+                gas = max(gas, cached[0])
+            self._gas[key] = (gas, time.time())
+        return gas
+
+    # ---------- FEE ----------
+    def fees(self):
+        """Field fee untuk tx baru: maxFeePerGas & maxPriorityFeePerGas (atau gasPrice)"""
+        fees = self._cached_fees()
+        if fees is None:
+            fees = self._store_fees(self._fetch_fees())
+        return fees
+
+    async def fees_async(self):
+        fees = self._cached_fees()
+        if fees is None:
+            fees = self._store_fees(await self._fetch_fees_async())
+        return fees
+
+    def _cached_fees(self):
+        with self._lock:
+            if self._fees is not None and time.time() - self._fees_at < self.refresh_seconds:
+                return dict(self._fees)
+        return None
+
+    def _store_fees(self, fees):
+        with self._lock:
+            self._fees = fees
+            self._fees_at = time.time()
+        return dict(fees)
+
+    def _fetch_fees(self):
+        history = self.w3.eth.fee_history(self.history_blocks, "latest", [self.reward_percentile])
+        next_base, priority = self._parse_history(history)
+        if next_base is None:
+            # Chain legacy (tanpa base fee)
+            return {"gasPrice": self.w3.eth.gas_price}
+        if priority is None:
+            priority = self.w3.eth.max_priority_fee
+        return self._eip1559(next_base, priority)
+
+    async def _fetch_fees_async(self):
+        history = await self.async_w3.eth.fee_history(self.history_blocks, "latest", [self.reward_percentile])
+        next_base, priority = self._parse_history(history)
+        if next_base is None:
+            return {"gasPrice": await self.async_w3.eth.gas_price}
+        if priority is None:
+            priority = await self.async_w3.eth.max_priority_fee
+        return self._eip1559(next_base, priority)
+
+    @staticmethod
+    def _parse_history(history):
+        """(base fee blok berikutnya, median priority fee); None jika tidak ada"""
+        base_fees = history.get("baseFeePerGas") or []
+        if not base_fees or base_fees[-1] is None:
+            return None, None
+        rewards = sorted(r[0] for r in history.get("reward") or [] if r)
+        # Elemen terakhir baseFeePerGas = base fee blok berikutnya
+        return base_fees[-1], rewards[len(rewards) // 2] if rewards else None
+
+    def _eip1559(self, next_base, priority):
+        priority = max(priority, self.min_priority_fee)
+        return {
+            "maxPriorityFeePerGas": priority,
+            "maxFeePerGas": next_base * self.base_fee_multiplier + priority,
+        }
+
+    # ---------- BUILD ----------
+    def build(self, func_call, sender, nonce, value=0, precheck=False):
+        """
+        Bangun tx lengkap (type-2 jika didukung) dari pemanggilan fungsi contract.
+        precheck=True: gas tidak diambil dari cache (revert terdeteksi sebelum kirim).
+        """
+        tx = self._unsigned(func_call, sender, nonce, value, self.fees())
+        tx["gas"] = self.gas_limit(tx, cache=not precheck)
+        return tx
+
+    async def build_async(self, func_call, sender, nonce, value=0, precheck=False):
+        tx = self._unsigned(func_call, sender, nonce, value, await self.fees_async())
+        tx["gas"] = await self.gas_limit_async(tx, cache=not precheck)
+        return tx
+
+    def _unsigned(self, func_call, sender, nonce, value, fees):
+        # Semua field diisi -> build_transaction tidak memanggil node
+        tx = func_call.build_transaction({
+            "chainId": self.chain_id,
+            "from": sender,
+            "nonce": nonce,
+            "value": value,
+            "gas": 0,  # Diisi pemanggil (hindari estimateGas bawaan web3)
+            **fees,
+        })
+        if "maxFeePerGas" in tx:
+            tx["type"] = 2
+        return tx
+
+    def bump(self, tx, factor=1.125):
+        """
+        Replace-by-fee: tx yang sama (nonce sama) dengan fee minimal +12.5%
+        (batas minimal node untuk mengganti tx di mempool), atau fee pasar
+        terbaru jika lebih tinggi.
+        """
+        return self._bumped(tx, factor, self.fees())
+
+    async def bump_async(self, tx, factor=1.125):
+        return self._bumped(tx, factor, await self.fees_async())
+
+    @staticmethod
+    def _bumped(tx, factor, current):
+        tx = dict(tx)
+        if "maxFeePerGas" in tx:
+            tx["maxPriorityFeePerGas"] = max(math.ceil(tx["maxPriorityFeePerGas"] * factor),
+                                             current.get("maxPriorityFeePerGas", 0))
+            tx["maxFeePerGas"] = max(math.ceil(tx["maxFeePerGas"] * factor),
+                                     current.get("maxFeePerGas", 0), tx["maxPriorityFeePerGas"])
+        else:
+            tx["gasPrice"] = max(math.ceil(tx["gasPrice"] * factor), current.get("gasPrice", 0))
+        return tx
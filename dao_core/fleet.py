@@ -0,0 +1,78 @@
+import threading
+
+# ================= PENJELASAN =================
+# Tabel armada (materialized) di memori, pengganti loop machines(i)
+# yang 1 round-trip per mesin:
+# - struct mesin baru diambil sekaligus lewat BatchReader (batch / Multicall3),
+# - totalSales diperbarui dari event CoffeeOrdered (bukan baca ulang struct),
+# - paginasi & sorting (ID / penjualan / lokasi) dilayani dari memori.
+# Di contract, mesin hanya bisa ditambah (addMachine) dan lokasi/status
+# tidak pernah berubah, jadi cukup memantau machineCount + CoffeeOrdered.
+#
+# Event dibaca dari EventStore bersama (satu sweep eth_getLogs untuk semua
+# komponen), yang hanya berisi blok final (head - confirmations). Struct
+# juga dibaca di blok final itu, jadi tabel tidak pernah memuat penjualan
+# dari blok yang masih bisa kena reorg.
+
+SORT_KEYS = {
+    "id": lambda m: m["id"],
+    "sales": lambda m: m["total_sales"],
+    "location": lambda m: m["location"].lower(),
+}
+
+
+class FleetTable:
+
+    def __init__(self, w3, contract, reader, events, batch_size=200):
+        self.w3 = w3
+        self.contract = contract
+        self.reader = reader
+        self.events = events  # EventStore bersama (event sampai blok final)
+        self.batch_size = batch_size
+
+        self.machines = {}  # machineId -> {id, location, is_active, total_sales (wei)}
+        self.block = None   # Blok terakhir yang sudah tercermin di tabel
+        self._lock = threading.Lock()
+
+    def sync(self):
+        """Bawa tabel ke blok final terbaru. Return nomor blok tabel."""
+        with self._lock:
+            head = self.reader.cache.head() if self.reader.cache is not None else self.w3.eth.block_number
+            block = self.events.confirmed(head)
+            if block < self.events.start_block or (self.block is not None and block <= self.block):
+                return self.block  # Belum ada blok final baru (atau belum ada sama sekali)
+            self.events.sync(head)
+            block = min(block, self.events.last_block())
+
+            # 1. Penjualan baru untuk mesin yang SUDAH ada di tabel
+            if self.block is not None:
+                for row in self.events.rows(["CoffeeOrdered"], after_block=self.block, to_block=block):
+                    machine = self.machines.get(row["machine_id"])
+                    if machine is not None:
+                        machine["total_sales"] += row["amount"]
+
+            # 2. Mesin baru: struct dibaca di blok final (totalSales sudah termasuk
+            #    semua penjualan sampai blok itu, jadi tidak dihitung dobel)
+            data, _ = self.reader.read({"count": self.contract.functions.machineCount()}, block=block)
+            new_ids = list(range(len(self.machines) + 1, data["count"] + 1))
+            for start in range(0, len(new_ids), self.batch_size):
+                chunk = new_ids[start:start + self.batch_size]
+                structs, _ = self.reader.read(
+                    {i: self.contract.functions.machines(i) for i in chunk}, block=block
+                )
+                for i in chunk:
+                    # Struct: (id, location, isActive, totalSales)
+                    m = structs[i]
+                    self.machines[i] = {"id": m[0], "location": m[1], "is_active": m[2], "total_sales": m[3]}
+
+            self.block = block
+            return self.block
+
+    def page(self, offset=0, limit=None, sort="id", descending=False):
+        """Return (total mesin, list mesin di halaman ini)"""
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Sort tidak dikenal: {sort} (pilihan: {', '.join(SORT_KEYS)})")
+        with self._lock:
+            rows = sorted(self.machines.values(), key=SORT_KEYS[sort], reverse=descending)
+        end = None if limit is None else offset + limit
+        return len(rows), [dict(m) for m in rows[offset:end]]
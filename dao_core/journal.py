@@ -0,0 +1,163 @@
+import json
+import os
+import threading
+
+# ================= PENJELASAN =================
+# Jurnal dispense (append-only, JSON per baris) supaya setiap pesanan
+# hanya dibuat SATU kali walaupun controller restart / log terkirim ulang.
+#
+# Kunci pesanan: (txHash, logIndex). Status:
+#   received   -> pesanan tercatat, belum diproses hardware
+#   dispensing -> hardware mulai bekerja (ditulis DURABLE sebelum mulai)
+#   done       -> kopi selesai
+#
+# fsync dilakukan berkelompok (group commit) oleh satu thread flusher:
+# banyak record berbagi satu fsync, jadi tidak ada biaya fsync per cup.
+# Hanya status "dispensing" yang menunggu fsync, karena itu satu-satunya
+# titik yang mencegah kopi keluar dua kali setelah crash.
+
+RECEIVED = "received"
+DISPENSING = "dispensing"
+DONE = "done"
+
+
+class DispenseJournal:
+    """Jurnal status pesanan per (txHash, logIndex) + checkpoint blok terakhir"""
+
+    def __init__(self, path="dispense-journal.jsonl", flush_interval=0.05, retain_blocks=0):
+        self.path = path
+        self.flush_interval = flush_interval
+        # Replay saat startup mulai dari last_block - retain_blocks (jumlah
+        # konfirmasi), jadi pesanan "done" di rentang itu harus tetap diingat
+        self.retain_blocks = retain_blocks
+
+        self.states = {}   # (tx, log) -> status terakhir
+        self.orders = {}   # (tx, log) -> data pesanan (record "received")
+        self.last_block = None
+        # Blok terkecil yang pesanan "done"-nya masih diingat (hasil compaction).
+        # Replay dari bawah blok ini bisa membuat kopi dua kali.
+        self.horizon = None
+
+        self._load()
+        self._compact()
+
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._cond = threading.Condition()
+        self._written = 0
+        self._synced = 0
+        threading.Thread(target=self._flusher, daemon=True).start()
+
+    # ---------- STARTUP ----------
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    break  # Baris terakhir terpotong karena crash saat menulis
+                self._apply(rec)
+
+    def _apply(self, rec):
+        if rec["block"] is not None:
+            self.last_block = max(self.last_block or 0, rec["block"])
+        if rec["state"] == "checkpoint":
+            return
+        key = (rec["tx"], rec["log"])
+        self.states[key] = rec["state"]
+        self.orders.setdefault(key, rec)
+
+    def _compact(self):
+        """
+        Tulis ulang jurnal tanpa pesanan "done" yang lebih tua dari awal
+        replay (last_block - retain_blocks; log-nya tidak akan di-replay
+        lagi), supaya file tidak tumbuh tanpa batas.
+        """
+        replay_from = (self.last_block or 0) - self.retain_blocks
+        if self.last_block is not None:
+            self.horizon = max(replay_from, 0)
+        keep = [
+            dict(self.orders[key], state=state)
+            for key, state in self.states.items()
+            if key in self.orders
+            and (state != DONE or self.orders[key]["block"] >= replay_from)
+        ]
+        self.states = {(r["tx"], r["log"]): r["state"] for r in keep}
+        self.orders = {(r["tx"], r["log"]): self.orders[(r["tx"], r["log"])] for r in keep}
+
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for rec in keep:
+                f.write(json.dumps(rec) + "\n")
+            if self.last_block is not None:
+                f.write(json.dumps({"state": "checkpoint", "block": self.last_block}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    # ---------- TULIS ----------
+    def _append(self, rec, durable=False):
+        with self._cond:
+            self._file.write(json.dumps(rec) + "\n")
+            self._written += 1
+            seq = self._written
+            self._apply(rec)
+            self._cond.notify_all()
+            if durable:
+                # Tunggu group commit berikutnya (maks ~flush_interval)
+                while self._synced < seq:
+                    self._cond.wait()
+
+    def _flusher(self):
+        while True:
+            with self._cond:
+                self._cond.wait(timeout=self.flush_interval)
+                if self._synced == self._written:
+                    continue
+                target = self._written
+                self._file.flush()
+
+            # fsync di luar lock: listener tetap bisa menulis record baru
+            os.fsync(self._file.fileno())
+
+            with self._cond:
+                self._synced = target
+                self._cond.notify_all()
+
+    def flush(self):
+        """Tunggu semua record yang sudah ditulis masuk disk (misal sebelum shutdown)"""
+        with self._cond:
+            seq = self._written
+            self._cond.notify_all()
+            while self._synced < seq:
+                self._cond.wait()
+
+    def receive(self, key, block, **order):
+        """Catat pesanan baru. Return False jika pesanan ini sudah pernah dijurnal."""
+        with self._cond:
+            if key in self.states:
+                return False
+            self._append(dict(order, tx=key[0], log=key[1], block=block, state=RECEIVED))
+            return True
+
+    def mark(self, key, state, durable=False):
+        rec = dict(self.orders[key], state=state)
+        self._append(rec, durable=durable)
+
+    def checkpoint(self, block):
+        """Semua pesanan sampai `block` sudah tercatat"""
+        if self.last_block is None or block > self.last_block:
+            self._append({"state": "checkpoint", "block": block})
+
+    # ---------- BACA ----------
+    def state(self, key):
+        return self.states.get(key)
+
+    def pending(self):
+        """Pesanan yang sudah dibayar tapi belum mulai dibuat (dibuat ulang saat startup)"""
+        return [rec for key, rec in self.orders.items() if self.states[key] == RECEIVED]
+
+    def in_doubt(self):
+        """Pesanan yang terputus di tengah proses hardware (perlu dicek operator)"""
+        return [rec for key, rec in self.orders.items() if self.states[key] == DISPENSING]
@@ -0,0 +1,81 @@
+import threading
+import time
+
+# ================= PENJELASAN =================
+# Feed live untuk dashboard: SATU thread background per proses memantau
+# head. Hanya saat ada blok baru:
+# - event baru diambil ke EventStore (rentang blok baru saja, hanya sampai
+#   head - confirmations store); tabel Arrow hasilnya dibagikan apa adanya
+#   (immutable, tanpa salin),
+# - metrik dibaca ulang dalam satu batch read, lalu dicatat mana yang berubah.
+# Sesi browser cukup membandingkan `version` (nomor head) dengan versi yang
+# terakhir dirender; tidak ada RPC / rebuild data per viewer. Beban node &
+# CPU mengikuti aktivitas chain, bukan jumlah orang yang membuka dashboard.
+
+
+class LiveFeed:
+
+    def __init__(self, w3, store, reader, metric_calls, poll_interval=1.0):
+        self.w3 = w3
+        self.store = store
+        self.reader = reader
+        self.metric_calls = metric_calls   # nama -> pemanggilan fungsi contract
+        self.poll_interval = poll_interval
+
+        self.version = None   # Head terakhir yang sudah tercermin
+        self.events = store.table()  # Tabel Arrow semua event (urut blok naik)
+        self.metrics = {}
+        self.deltas = {}      # Metrik yang berubah di update terakhir -> selisihnya
+        self.new_rows = 0     # Jumlah event baru di update terakhir
+        self.error = None
+        self._cond = threading.Condition()
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    # ---------- UPDATE ----------
+    def refresh(self):
+        """Cek head; jika berubah, terapkan delta. Return True jika ada update."""
+        head = self.reader.cache.head() if self.reader.cache is not None else self.w3.eth.block_number
+        if head == self.version:
+            return False
+
+        # 1. Event baru saja (blok setelah checkpoint store)
+        new_rows = self.store.sync(head)
+        events = self.store.table()
+
+        # 2. Metrik di head, lalu bandingkan dengan versi sebelumnya
+        metrics, _ = self.reader.read(self.metric_calls, block=head)
+        deltas = {k: v - self.metrics[k] for k, v in metrics.items() if k in self.metrics and self.metrics[k] != v}
+
+        with self._cond:
+            self.events = events
+            self.metrics = metrics
+            self.deltas = deltas
+            self.new_rows = new_rows
+            self.version = head
+            self.error = None
+            self._cond.notify_all()
+        return True
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                self.error = str(e)
+                print(f"[LIVE] Gagal update dashboard: {e}")
+            time.sleep(self.poll_interval)
+
+    # ---------- BACA ----------
+    def snapshot(self):
+        """(version, metrics, deltas, events) yang konsisten satu sama lain"""
+        with self._cond:
+            return self.version, self.metrics, self.deltas, self.events
+
+    def wait(self, version, timeout=None):
+        """Tunggu sampai head berbeda dari `version`. Return versi terbaru."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.version != version, timeout)
+            return self.version
@@ -0,0 +1,182 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from eth_utils import event_abi_to_log_topic
+from requests.exceptions import ReadTimeout
+
+# ================= PENJELASAN =================
+# Pengambil log VendingMachineDAO dengan SATU request eth_getLogs.
+# topic0 semua event yang dibutuhkan dikirim sebagai OR-list
+# (topics = [[t1, t2, ...]]), lalu setiap log di-decode memakai ABI event
+# yang cocok lewat tabel lookup topic0 -> event.
+#
+# Untuk histori panjang, LogBackfiller memecah [from, to] menjadi chunk:
+# - chunk dibelah dua HANYA jika node menolak rentangnya (limit hasil /
+#   rentang terlalu lebar / timeout membaca response); error lain (node
+#   mati, koneksi putus) langsung diteruskan tanpa membelah,
+# - chunk diperbesar lagi jika hasilnya sedikit
+# - beberapa chunk diambil paralel (jumlah worker dibatasi)
+# Hasil tetap dikeluarkan berurutan dari blok terkecil.
+
+
+# Potongan pesan error node (geth, erigon, infura, alchemy, ...) yang
+# berarti rentang blok / jumlah hasil eth_getLogs terlalu besar
+RANGE_ERROR_MARKERS = (
+    "returned more than", "too many results", "block range", "range too",
+    "limited to", "response size", "too large", "timeout", "timed out",
+)
+# Pembatasan laju: membelah rentang justru menambah request
+RATE_LIMIT_MARKERS = ("rate limit", "too many requests")
+
+
+def is_range_error(exc):
+    """True jika error eth_getLogs bisa diatasi dengan memperkecil rentang blok"""
+    if isinstance(exc, (ReadTimeout, TimeoutError)):
+        return True
+    if isinstance(exc, ValueError):  # Web3RPCError: error dari node
+        message = str(exc).lower()
+        if any(marker in message for marker in RATE_LIMIT_MARKERS):
+            return False
+        return any(marker in message for marker in RANGE_ERROR_MARKERS)
+    return False
+
+
+def uint256_topic(value):
+    """Encode nilai uint256 indexed menjadi topic 32-byte (hex)"""
+    return "0x" + int(value).to_bytes(32, "big").hex()
+
+
+class EventLogReader:
+    """
+    Membaca banyak jenis event sekaligus dalam satu rentang blok.
+    Hasil sudah terurut (blockNumber, logIndex).
+    """
+
+    def __init__(self, w3, contract, event_names):
+        self.w3 = w3
+        self.contract = contract
+        self.event_names = list(event_names)
+
+        # Tabel lookup: topic0 (bytes) -> objek event contract untuk decode
+        self.events_by_topic = {}
+        for name in self.event_names:
+            event = contract.events[name]()
+            self.events_by_topic[bytes(event_abi_to_log_topic(event.abi))] = event
+
+    def topic_filter(self, *indexed_topics):
+        """
+        Posisi topic0 berisi OR-list semua event yang dipantau.
+        `indexed_topics` (opsional) mengisi topic1, topic2, ... agar
+        node yang memfilter (misal machineId tertentu saja).
+        """
+        return [["0x" + t.hex() for t in self.events_by_topic]] + list(indexed_topics)
+
+    def decode(self, log):
+        """Decode satu raw log. Return None jika topic0 tidak dikenal."""
+        event = self.events_by_topic.get(bytes(log['topics'][0]))
+        if event is None:
+            return None
+        return event.process_log(log)
+
+    def fetch(self, from_block, to_block, topics=None):
+        """
+        Satu eth_getLogs untuk semua event di rentang [from_block, to_block].
+        `topics` opsional untuk menambah filter topic1.. (misal machineId).
+        """
+        raw_logs = self.w3.eth.get_logs({
+            'address': self.contract.address,
+            'fromBlock': from_block,
+            'toBlock': to_block,
+            'topics': topics or self.topic_filter(),
+        })
+
+        decoded = []
+        for log in raw_logs:
+            if log.get('removed'):
+                continue
+            e = self.decode(log)
+            if e is not None:
+                decoded.append(e)
+
+        # Node umumnya sudah mengirim urut; sort ini hanya jaminan (murah untuk data terurut)
+        decoded.sort(key=lambda e: (e['blockNumber'], e['logIndex']))
+        return decoded
+
+
+class LogBackfiller:
+    """
+    Backfill log per chunk blok dengan ukuran adaptif dan worker paralel.
+    `fetch(from_block, to_block)` adalah fungsi pengambil log, misalnya
+    EventLogReader.fetch.
+    """
+
+    def __init__(self, fetch, chunk_size=2000, min_chunk=1, max_chunk=100000,
+                 target_logs=1000, workers=4):
+        self.fetch = fetch
+        self.chunk_size = chunk_size
+        self.min_chunk = min_chunk
+        self.max_chunk = max_chunk
+        self.target_logs = target_logs  # Jumlah log ideal per response
+        self.workers = workers
+
+    def _adjust(self, logs_count):
+        """Perbesar chunk jika response kecil, perkecil jika terlalu besar"""
+        if logs_count < self.target_logs // 4:
+            self.chunk_size = min(self.chunk_size * 2, self.max_chunk)
+        elif logs_count > self.target_logs:
+            self.chunk_size = max(self.chunk_size // 2, self.min_chunk)
+
+    def iter_chunks(self, from_block, to_block):
+        """
+        Generator (chunk_from, chunk_to, logs) berurutan dari from_block.
+        Chunk yang ditolak karena rentang/hasil terlalu besar dibelah dua dan
+        dicoba ulang; jika chunk sudah seukuran min_chunk dan tetap error,
+        atau error-nya bukan soal rentang (koneksi, dsb.), exception diteruskan.
+        chunk_size yang mengecil karena error naik lagi lewat _adjust saat
+        response berikutnya sedikit.
+        """
+        next_block = from_block
+        emit_cursor = from_block
+        pending = {}   # future -> (a, b)
+        finished = {}  # a -> (b, logs), menunggu giliran dikeluarkan
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while next_block <= to_block or pending:
+                # Isi antrian worker dengan chunk berikutnya
+                while len(pending) < self.workers and next_block <= to_block:
+                    b = min(next_block + self.chunk_size - 1, to_block)
+                    pending[pool.submit(self.fetch, next_block, b)] = (next_block, b)
+                    next_block = b + 1
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    a, b = pending.pop(future)
+                    try:
+                        logs = future.result()
+                    except Exception as e:
+                        size = b - a + 1
+                        if size <= self.min_chunk or not is_range_error(e):
+                            for other in pending:
+                                other.cancel()
+                            raise
+                        # Node menolak (terlalu banyak log / timeout): belah dua
+                        self.chunk_size = max(size // 2, self.min_chunk)
+                        mid = a + size // 2 - 1
+                        pending[pool.submit(self.fetch, a, mid)] = (a, mid)
+                        pending[pool.submit(self.fetch, mid + 1, b)] = (mid + 1, b)
+                        continue
+
+                    self._adjust(len(logs))
+                    finished[a] = (b, logs)
+
+                # Keluarkan chunk yang sudah berurutan
+                while emit_cursor in finished:
+                    b, logs = finished.pop(emit_cursor)
+                    yield emit_cursor, b, logs
+                    emit_cursor = b + 1
+
+    def fetch_all(self, from_block, to_block):
+        """Semua log dalam rentang sebagai satu list terurut"""
+        result = []
+        for _, _, logs in self.iter_chunks(from_block, to_block):
+            result.extend(logs)
+        return result
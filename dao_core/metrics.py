@@ -0,0 +1,65 @@
+import threading
+import time
+from collections import deque
+
+from web3 import Web3
+
+# ================= PENJELASAN =================
+# Metrik ringan untuk controller mesin:
+# - LatencyStats: sampel latency terakhir (median / p95 / p99)
+# - CountingHTTPProvider: HTTPProvider yang menghitung request RPC,
+#   supaya beban tiap mesin ke node RPC bisa dilihat.
+
+
+class LatencyStats:
+    """Menyimpan N sampel latency terakhir (detik) dan menghitung persentil"""
+
+    def __init__(self, window=1000):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+
+    def percentile(self, p):
+        with self._lock:
+            data = sorted(self._samples)
+        if not data:
+            return None
+        k = min(len(data) - 1, int(round(p / 100 * (len(data) - 1))))
+        return data[k]
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+
+class CountingHTTPProvider(Web3.HTTPProvider):
+    """HTTPProvider biasa + penghitung jumlah request ke node RPC"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.request_count = 0
+        self.started_at = time.time()
+        self._count_lock = threading.Lock()
+
+    def make_request(self, method, params):
+        with self._count_lock:
+            self.request_count += 1
+        return super().make_request(method, params)
+
+    def requests_per_minute(self):
+        elapsed = max(time.time() - self.started_at, 1e-9)
+        return self.request_count * 60 / elapsed
+
+
+def fmt_seconds(value):
+    """Format latency untuk log: '1.23s' atau '-' jika belum ada sampel"""
+    return "-" if value is None else f"{value:.2f}s"
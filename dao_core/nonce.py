@@ -0,0 +1,97 @@
+import threading
+from contextlib import contextmanager, asynccontextmanager
+
+# ================= PENJELASAN =================
+# Pembagi nonce lokal per akun. Nonce diambil SEKALI dari node
+# (get_transaction_count 'pending'), setelah itu dibagikan dari memori:
+# - tidak ada round-trip RPC tambahan per transaksi,
+# - dua request admin yang bersamaan tidak pernah dapat nonce yang sama,
+# - beberapa transaksi per akun bisa in-flight sekaligus (pipelining).
+# Jika pengiriman gagal / node menjawab "nonce too low", nonce akun
+# disinkron ulang dari node pada alokasi berikutnya.
+
+# Potongan pesan error node yang berarti nonce lokal sudah tidak cocok
+# ("nonce too low", "invalid transaction nonce", ...)
+NONCE_ERRORS = ("nonce", "already known", "replacement transaction underpriced")
+
+
+def is_nonce_error(error):
+    message = str(error).lower()
+    return any(text in message for text in NONCE_ERRORS)
+
+
+class NonceManager:
+    """
+    Alokator nonce per akun, aman untuk banyak thread maupun coroutine.
+    `w3` boleh Web3 (pakai next / reserve) atau AsyncWeb3
+    (pakai next_async / reserve_async).
+    """
+
+    def __init__(self, w3):
+        self.w3 = w3
+        self._next = {}  # address -> nonce berikutnya yang belum dibagikan
+        self._lock = threading.Lock()
+        self.resyncs = 0
+
+    def _take(self, address, chain_count=None):
+        """Bagikan nonce dari memori. Return None jika akun belum pernah disinkron."""
+        with self._lock:
+            if address not in self._next:
+                if chain_count is None:
+                    return None
+                self._next[address] = chain_count
+            nonce = self._next[address]
+            self._next[address] += 1
+            return nonce
+
+    def next(self, address):
+        nonce = self._take(address)
+        if nonce is None:
+            nonce = self._take(address, self.w3.eth.get_transaction_count(address, "pending"))
+        return nonce
+
+    async def next_async(self, address):
+        nonce = self._take(address)
+        if nonce is None:
+            nonce = self._take(address, await self.w3.eth.get_transaction_count(address, "pending"))
+        return nonce
+
+    def resync(self, address):
+        """Lupakan nonce lokal; alokasi berikutnya membaca ulang dari node"""
+        with self._lock:
+            self._next.pop(address, None)
+            self.resyncs += 1
+
+    def failed(self, address, nonce, error):
+        """
+        Transaksi dengan nonce ini gagal dikirim. Jika itu nonce terakhir
+        yang dibagikan, nonce dikembalikan; jika tidak (ada celah) atau
+        node menolak karena nonce, akun disinkron ulang.
+        """
+        with self._lock:
+            if self._next.get(address) == nonce + 1 and not is_nonce_error(error):
+                self._next[address] = nonce
+                return
+        self.resync(address)
+
+    @contextmanager
+    def reserve(self, address):
+        """
+        with nonces.reserve(addr) as nonce:
+            ... build, sign, send_raw_transaction ...
+        """
+        nonce = self.next(address)
+        try:
+            yield nonce
+        except Exception as e:
+            self.failed(address, nonce, e)
+            raise
+
+    @asynccontextmanager
+    async def reserve_async(self, address):
+        nonce = await self.next_async(address)
+        try:
+            yield nonce
+        except Exception as e:
+            self.failed(address, nonce, e)
+            raise
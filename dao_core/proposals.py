@@ -0,0 +1,136 @@
+import threading
+
+from dao_core.erc20 import ERC20_READ_ABI
+
+# ================= PENJELASAN =================
+# Daftar proposal (materialized) di memori, dibangun dari event:
+# - ProposalCreated  -> proposal baru; struct dibaca SEKALI (batch) untuk
+#   field yang tidak ada di event (tipe, target, amount, endTime),
+# - Voted            -> tambah bobot suara + daftar pemilih,
+# - ProposalExecuted -> tandai selesai.
+# Event dibaca dari EventStore bersama (satu sweep eth_getLogs untuk semua
+# komponen, hanya blok final = head - confirmations). Setiap sync hanya
+# memproses baris blok baru, jadi tidak ada lagi loop proposals(i) untuk
+# semua proposal yang pernah dibuat. Struct, totalSupply & timestamp juga
+# dibaca di blok final itu, jadi vote dari blok yang kena reorg tidak
+# pernah ikut dihitung.
+#
+# Status: executed / expired (endTime lewat, dibanding timestamp blok final) / active.
+# ID proposal aktif disimpan terpisah (diperbarui saat dibuat, dieksekusi,
+# atau kedaluwarsa), jadi active() sebanding dengan jumlah proposal aktif,
+# bukan semua proposal yang pernah dibuat.
+# Quorum: contract auto-execute jika voteCount > totalSupply saham / 2.
+
+ACTIVE = "active"
+EXPIRED = "expired"
+EXECUTED = "executed"
+
+
+class ProposalStore:
+
+    def __init__(self, w3, contract, reader, events, batch_size=200):
+        self.w3 = w3
+        self.contract = contract
+        self.reader = reader
+        self.events = events  # EventStore bersama (event sampai blok final)
+        self.batch_size = batch_size
+
+        self.proposals = {}      # proposalId -> dict (lihat _load_new)
+        self.active_ids = set()  # Proposal yang masih bisa di-vote
+        self.block = None        # Blok terakhir yang sudah tercermin
+        self.chain_time = None   # Timestamp blok final (acuan status)
+        self.total_supply = 0    # Total saham di blok final (acuan quorum)
+        self._asset = None
+        self._lock = threading.Lock()
+
+    def sync(self):
+        """Bawa daftar proposal ke blok final terbaru. Return nomor blok."""
+        with self._lock:
+            head = self.reader.cache.head() if self.reader.cache is not None else self.w3.eth.block_number
+            block = self.events.confirmed(head)
+            if block < self.events.start_block or (self.block is not None and block <= self.block):
+                return self.block  # Belum ada blok final baru (atau belum ada sama sekali)
+            self.events.sync(head)
+            block = min(block, self.events.last_block())
+            rows = self.events.rows(["ProposalCreated", "Voted", "ProposalExecuted"],
+                                    after_block=self.block, to_block=block)
+
+            # 1. Proposal baru: struct dibaca di blok final, jadi voteCount & executed
+            #    sudah mencakup semua event di rentang ini (tidak dihitung dobel)
+            new_ids = [r["proposal_id"] for r in rows
+                       if r["event"] == "ProposalCreated" and r["proposal_id"] not in self.proposals]
+            known = set(self.proposals)
+            self._load_new(new_ids, block)
+
+            # 2. Suara & eksekusi untuk proposal yang sudah ada sebelumnya.
+            #    Daftar pemilih selalu dari event (tidak ada di struct).
+            for row in rows:
+                p = self.proposals.get(row["proposal_id"])
+                if p is None:
+                    continue
+                if row["event"] == "Voted":
+                    p["voters"][row["actor"]] = row["amount"]
+                    if row["proposal_id"] in known:
+                        p["vote_count"] += row["amount"]
+                elif row["event"] == "ProposalExecuted":
+                    p["executed"] = True
+                    self.active_ids.discard(row["proposal_id"])
+
+            # 3. Acuan status & quorum di blok final (2 read, bukan per proposal)
+            if self._asset is None:
+                data, _ = self.reader.read({"asset": self.contract.functions.assetToken()}, block=block)
+                self._asset = self.w3.eth.contract(address=data["asset"], abi=ERC20_READ_ABI)
+            data, _ = self.reader.read({"supply": self._asset.functions.totalSupply()}, block=block)
+            self.total_supply = data["supply"]
+            self.chain_time = self.w3.eth.get_block(block)["timestamp"]
+            self.active_ids = {i for i in self.active_ids if self.status(self.proposals[i]) == ACTIVE}
+
+            self.block = block
+            return self.block
+
+    def _load_new(self, new_ids, block):
+        for start in range(0, len(new_ids), self.batch_size):
+            chunk = new_ids[start:start + self.batch_size]
+            structs, _ = self.reader.read(
+                {i: self.contract.functions.proposals(i) for i in chunk}, block=block
+            )
+            for i in chunk:
+                # Struct: (id, pType, target, amount, desc, voteCount, executed, endTime)
+                p = structs[i]
+                self.proposals[i] = {
+                    "id": p[0], "type_code": p[1], "target": p[2], "amount": p[3],
+                    "description": p[4], "vote_count": p[5], "executed": p[6],
+                    "end_time": p[7], "voters": {},
+                }
+                if not p[6]:
+                    self.active_ids.add(i)
+
+    # ---------- QUERY ----------
+    def status(self, p):
+        if p["executed"]:
+            return EXECUTED
+        if self.chain_time is not None and self.chain_time >= p["end_time"]:
+            return EXPIRED
+        return ACTIVE
+
+    def quorum_progress(self, p):
+        """voteCount / batas auto-execute (> 1.0 berarti lolos)"""
+        threshold = self.total_supply // 2
+        return p["vote_count"] / threshold if threshold else None
+
+    def _row(self, p):
+        return dict(p, voters=dict(p["voters"]), status=self.status(p),
+                    quorum_progress=self.quorum_progress(p))
+
+    def list(self, status=None):
+        """Semua proposal (urut ID), opsional hanya status tertentu"""
+        if status == ACTIVE:
+            return self.active()
+        with self._lock:
+            rows = [self._row(self.proposals[i]) for i in sorted(self.proposals)]
+        return [r for r in rows if status is None or r["status"] == status]
+
+    def active(self):
+        """Proposal aktif saja (hanya menelusuri active_ids)"""
+        with self._lock:
+            return [self._row(self.proposals[i]) for i in sorted(self.active_ids)]
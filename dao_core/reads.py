@@ -0,0 +1,196 @@
+import asyncio
+
+from eth_utils.abi import get_abi_output_types
+from hexbytes import HexBytes
+
+# ================= PENJELASAN =================
+# Pembaca view call secara batch. Beberapa .call() yang biasanya
+# dikirim satu per satu (1 round-trip per call) dikumpulkan lalu:
+# - dikirim dalam SATU eth_call ke Multicall3 (jika MULTICALL_ADDRESS ada):
+#   atomik, satu round-trip, sekaligus mengembalikan nomor blok, atau
+# - dikirim sebagai SATU batch JSON-RPC eth_call yang semuanya dipatok
+#   ke nomor blok yang sama.
+# Hasilnya konsisten: semua angka dashboard berasal dari blok yang sama.
+# Jika diberi ReadCache, hanya call yang belum ada di cache yang dikirim.
+# read_async() (untuk handler async, butuh AsyncWeb3) mengirim semua
+# eth_call bersamaan dengan asyncio.gather, tetap dipatok ke satu blok.
+# Di atas `gather_limit` call (misal laporan ratusan wallet) dipakai satu
+# batch JSON-RPC supaya tidak membanjiri pool koneksi.
+
+# Alamat Multicall3 yang sama di hampir semua chain EVM publik
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+MULTICALL3_ABI = [{
+    "name": "tryBlockAndAggregate",
+    "type": "function",
+    "stateMutability": "payable",
+    "inputs": [
+        {"name": "requireSuccess", "type": "bool"},
+        {"name": "calls", "type": "tuple[]", "components": [
+            {"name": "target", "type": "address"},
+            {"name": "callData", "type": "bytes"},
+        ]},
+    ],
+    "outputs": [
+        {"name": "blockNumber", "type": "uint256"},
+        {"name": "blockHash", "type": "bytes32"},
+        {"name": "returnData", "type": "tuple[]", "components": [
+            {"name": "success", "type": "bool"},
+            {"name": "returnData", "type": "bytes"},
+        ]},
+    ],
+}]
+
+
+class BatchReader:
+    """
+    reader = BatchReader(w3)
+    values, block = reader.read({
+        "revenue": contract.functions.totalRevenue(),
+        "price": contract.functions.coffeePrice(),
+    })
+    """
+
+    def __init__(self, w3, multicall_address=None, cache=None, async_w3=None, gather_limit=16):
+        self.w3 = w3
+        self.async_w3 = async_w3
+        self.gather_limit = gather_limit
+        self.cache = cache
+        self.multicall = None
+        self.async_multicall = None
+        if multicall_address:
+            address = w3.to_checksum_address(multicall_address)
+            self.multicall = w3.eth.contract(address=address, abi=MULTICALL3_ABI)
+            if async_w3 is not None:
+                self.async_multicall = async_w3.eth.contract(address=address, abi=MULTICALL3_ABI)
+        self.round_trips = 0
+
+    def read(self, calls, block=None):
+        """
+        Jalankan semua view call (dict nama -> pemanggilan fungsi contract)
+        di satu blok. Return (dict nama -> hasil decode, nomor blok).
+        """
+        values = {}
+        names = list(calls)
+        if self.cache is not None:
+            # Head dari cache (tanpa eth_blockNumber tambahan setiap read)
+            if block is None:
+                block = self.cache.head()
+            names = self._from_cache(calls, block, values)
+            if not names:
+                return values, block
+
+        encoded = [(calls[n].address, calls[n]._encode_transaction_data()) for n in names]
+        if self.multicall is not None:
+            raw, block = self._via_multicall(encoded, block)
+        else:
+            raw, block = self._via_batch(encoded, block)
+        return self._decode(calls, names, raw, block, values)
+
+    async def read_async(self, calls, block=None):
+        """Versi async dari read() (butuh async_w3)"""
+        values = {}
+        names = list(calls)
+        if self.cache is not None:
+            if block is None:
+                block = await self.cache.head_async(self.async_w3)
+            names = self._from_cache(calls, block, values)
+            if not names:
+                return values, block
+
+        encoded = [(calls[n].address, calls[n]._encode_transaction_data()) for n in names]
+        if self.async_multicall is not None:
+            raw, block = await self._via_multicall_async(encoded, block)
+        elif len(encoded) > self.gather_limit:
+            raw, block = await self._via_batch_async(encoded, block)
+        else:
+            raw, block = await self._via_gather(encoded, block)
+        return self._decode(calls, names, raw, block, values)
+
+    def _from_cache(self, calls, block, values):
+        """Isi `values` dari cache. Return nama call yang belum ada di cache."""
+        missing = []
+        for name in calls:
+            found, value = self.cache.get(calls[name], block)
+            if found:
+                values[name] = value
+            else:
+                missing.append(name)
+        return missing
+
+    def _decode(self, calls, names, raw, block, values):
+        for name, data in zip(names, raw):
+            output_types = get_abi_output_types(calls[name].abi)
+            decoded = self.w3.codec.decode(output_types, data)
+            # Sama seperti .call(): satu output -> nilai, banyak output -> list
+            values[name] = decoded[0] if len(decoded) == 1 else list(decoded)
+            if self.cache is not None:
+                self.cache.put(calls[name], block, values[name])
+        return values, block
+
+    def _via_multicall(self, encoded, block):
+        self.round_trips += 1
+        block_number, _, results = self.multicall.functions.tryBlockAndAggregate(
+            False, [(target, HexBytes(data)) for target, data in encoded]
+        ).call(block_identifier=block if block is not None else "latest")
+        return self._unpack_multicall(encoded, results), block_number
+
+    async def _via_multicall_async(self, encoded, block):
+        self.round_trips += 1
+        block_number, _, results = await self.async_multicall.functions.tryBlockAndAggregate(
+            False, [(target, HexBytes(data)) for target, data in encoded]
+        ).call(block_identifier=block if block is not None else "latest")
+        return self._unpack_multicall(encoded, results), block_number
+
+    def _unpack_multicall(self, encoded, results):
+        raw = []
+        for (target, data), (success, return_data) in zip(encoded, results):
+            if not success:
+                raise ValueError(f"View call {data[:10]} ke {target} gagal (revert)")
+            raw.append(bytes(return_data))
+        return raw
+
+    def _via_batch(self, encoded, block):
+        if block is None:
+            # Patok ke satu blok supaya semua call konsisten
+            self.round_trips += 1
+            block = self.w3.eth.block_number
+
+        self.round_trips += 1
+        responses = self.w3.provider.make_batch_request(self._batch_calls(encoded, block))
+        return self._unpack_batch(encoded, responses), block
+
+    async def _via_batch_async(self, encoded, block):
+        if block is None:
+            self.round_trips += 1
+            block = await self.async_w3.eth.block_number
+
+        self.round_trips += 1
+        responses = await self.async_w3.provider.make_batch_request(self._batch_calls(encoded, block))
+        return self._unpack_batch(encoded, responses), block
+
+    def _batch_calls(self, encoded, block):
+        return [("eth_call", [{"to": target, "data": data}, hex(block)]) for target, data in encoded]
+
+    def _unpack_batch(self, encoded, responses):
+        if isinstance(responses, dict):
+            # Node menolak seluruh batch (misal batch terlalu besar)
+            raise ValueError(f"Batch eth_call ditolak node: {responses.get('error')}")
+        raw = []
+        for (target, data), response in zip(encoded, responses):
+            if "error" in response:
+                raise ValueError(f"View call {data[:10]} ke {target} gagal: {response['error']}")
+            raw.append(bytes(HexBytes(response["result"])))
+        return raw
+
+    async def _via_gather(self, encoded, block):
+        if block is None:
+            self.round_trips += 1
+            block = await self.async_w3.eth.block_number
+
+        # Semua eth_call jalan bersamaan (koneksi dari pool keep-alive)
+        self.round_trips += 1
+        results = await asyncio.gather(*(
+            self.async_w3.eth.call({"to": target, "data": data}, block) for target, data in encoded
+        ))
+        return [bytes(r) for r in results], block
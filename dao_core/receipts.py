@@ -0,0 +1,219 @@
+import json
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import Future
+
+# ================= PENJELASAN =================
+# Pelacak receipt di background: pemanggil mengirim transaksi lalu
+# langsung mendapat tx hash (ID pelacakan) tanpa menunggu blok.
+# Satu thread memantau head; setiap ada blok baru, SEMUA hash yang masih
+# pending dicek dalam satu batch JSON-RPC eth_getTransactionReceipt.
+# Saat transaksi masuk blok (sukses / revert), Future diselesaikan dan
+# webhook (jika ada) dipanggil.
+#
+# DROPPED (tidak masuk blok sampai timeout) BUKAN status akhir: hash-nya
+# tetap ikut dicek di setiap blok baru (dan langsung ke node saat status()
+# ditanya), jadi tx yang ternyata masuk blok belakangan berubah jadi
+# sukses / revert dan webhook dipanggil lagi. Tx pengganti (speed-up,
+# info `replaces`) dikelompokkan dengan tx lamanya: begitu salah satu
+# masuk blok, yang lain (nonce sama, tidak mungkin masuk) ditandai REPLACED.
+
+PENDING = "pending"
+SUCCESS = "success"
+REVERTED = "reverted"
+DROPPED = "dropped"  # Tidak masuk blok sampai timeout (masih dicek ulang)
+REPLACED = "replaced"  # Tx lain dengan nonce yang sama (speed-up) sudah masuk blok
+
+
+def _hex(value):
+    return value.lower() if isinstance(value, str) else "0x" + bytes(value).hex()
+
+
+def _int(value):
+    # Respons batch mentah: node asli mengirim hex string
+    return int(value, 16) if isinstance(value, str) else value
+
+
+class ReceiptTracker:
+    """Status transaksi per tx hash + Future yang selesai saat receipt ada"""
+
+    def __init__(self, w3, poll_interval=1.0, timeout=600, history=10000, max_dropped=1000):
+        self.w3 = w3
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.history = history
+        self.max_dropped = max_dropped  # Maks hash DROPPED yang masih dicek ulang
+
+        self._records = OrderedDict()  # tx hash -> status (pending & selesai)
+        self._futures = {}             # tx hash -> Future (hanya pending)
+        self._dropped = OrderedDict()  # tx hash DROPPED yang masih dicek ulang
+        self._groups = {}              # tx hash -> set hash dengan nonce yang sama (speed-up)
+        self._webhooks = {}
+        self._lock = threading.Lock()
+        self._last_head = None
+        self._new = False  # Ada hash baru sejak batch terakhir
+        self.batches = 0
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    # ---------- API ----------
+    def track(self, tx_hash, webhook=None, **info):
+        """Mulai lacak tx. Return Future berisi status akhir (dict)."""
+        tx_hash = _hex(tx_hash)
+        with self._lock:
+            if tx_hash in self._futures:
+                return self._futures[tx_hash]
+            future = Future()
+            self._records[tx_hash] = dict(info, tx_hash=tx_hash, status=PENDING, submitted_at=time.time())
+            self._futures[tx_hash] = future
+            replaces = info.get("replaces")
+            if replaces:
+                group = self._groups.setdefault(_hex(replaces), {_hex(replaces)})
+                group.add(tx_hash)
+                self._groups[tx_hash] = group
+            if webhook:
+                self._webhooks[tx_hash] = webhook
+            self._new = True
+        return future
+
+    def status(self, tx_hash):
+        """
+        Status tx yang dilacak. Hash yang tidak dikirim lewat tracker ini,
+        atau yang berstatus DROPPED, dicek langsung ke node.
+        Return None jika node juga tidak mengenalnya.
+        """
+        tx_hash = _hex(tx_hash)
+        with self._lock:
+            record = self._records.get(tx_hash)
+            if record is not None and record["status"] != DROPPED:
+                return dict(record)
+
+        receipt = self.w3.provider.make_request("eth_getTransactionReceipt", [tx_hash]).get("result")
+        if receipt is not None:
+            if record is not None:
+                return self._receipt_found(tx_hash, receipt) or self._finished(dict(record), receipt)
+            return self._finished({"tx_hash": tx_hash}, receipt)
+        if record is not None:
+            return dict(record)
+        if self.w3.provider.make_request("eth_getTransactionByHash", [tx_hash]).get("result") is not None:
+            return {"tx_hash": tx_hash, "status": PENDING}
+        return None
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._futures)
+
+    # ---------- BACKGROUND ----------
+    def _run(self):
+        while True:
+            try:
+                self._poll()
+            except Exception as e:
+                print(f"[RECEIPT] Gagal cek receipt: {e}")
+            time.sleep(self.poll_interval)
+
+    def _poll(self):
+        with self._lock:
+            hashes = list(self._futures) + list(self._dropped)
+            new = self._new
+            self._new = False
+        if not hashes:
+            return
+
+        # Receipt hanya bisa berubah saat ada blok baru (atau hash baru
+        # yang mungkin sudah masuk blok sebelum dilacak)
+        head = self.w3.eth.block_number
+        if head == self._last_head and not new:
+            self._expire(time.time())
+            return
+        self._last_head = head
+
+        responses = self.w3.provider.make_batch_request(
+            [("eth_getTransactionReceipt", [h]) for h in hashes]
+        )
+        self.batches += 1
+        for tx_hash, response in zip(hashes, responses):
+            receipt = response.get("result")
+            if receipt is not None:
+                self._receipt_found(tx_hash, receipt)
+        self._expire(time.time())
+
+    def _receipt_found(self, tx_hash, receipt):
+        """Tandai tx selesai; tx lain dengan nonce yang sama jadi REPLACED"""
+        with self._lock:
+            record = self._records.get(tx_hash)
+            if record is None or record["status"] not in (PENDING, DROPPED):
+                return None
+            self._dropped.pop(tx_hash, None)
+            record = self._finished(record, receipt)
+            replaced = [
+                h for h in self._groups.get(tx_hash, ())
+                if h != tx_hash and h in self._records and self._records[h]["status"] in (PENDING, DROPPED)
+            ]
+            for h in replaced:
+                self._records[h].update(status=REPLACED, replaced_by=tx_hash)
+                self._dropped.pop(h, None)
+        self._resolve(tx_hash, record)
+        for h in replaced:
+            self._resolve(h, dict(self._records[h]))
+        return record
+
+    def _finished(self, record, receipt):
+        record.update(
+            status=SUCCESS if _int(receipt["status"]) == 1 else REVERTED,
+            block_number=_int(receipt["blockNumber"]),
+            gas_used=_int(receipt["gasUsed"]),
+            confirmed_at=time.time(),
+        )
+        return dict(record)
+
+    def _expire(self, now):
+        with self._lock:
+            expired = [
+                h for h in self._futures
+                if now - self._records[h]["submitted_at"] > self.timeout
+            ]
+            for h in expired:
+                self._records[h]["status"] = DROPPED
+                # Tetap dicek ulang: tx bisa masuk blok setelah timeout
+                self._dropped[h] = None
+            while len(self._dropped) > self.max_dropped:
+                self._dropped.popitem(last=False)
+        for h in expired:
+            self._resolve(h, dict(self._records[h]))
+
+    def _resolve(self, tx_hash, record):
+        with self._lock:
+            future = self._futures.pop(tx_hash, None)
+            # DROPPED belum final: webhook disimpan untuk status berikutnya
+            if record["status"] == DROPPED:
+                webhook = self._webhooks.get(tx_hash)
+            else:
+                webhook = self._webhooks.pop(tx_hash, None)
+            # Riwayat status selesai dibatasi (yang paling lama dibuang)
+            self._records.move_to_end(tx_hash)
+            while len(self._records) > self.history:
+                oldest = next(iter(self._records))
+                if oldest in self._futures:
+                    break
+                del self._records[oldest]
+                self._dropped.pop(oldest, None)
+                self._webhooks.pop(oldest, None)
+                self._groups.pop(oldest, set()).discard(oldest)
+        if future is not None:
+            future.set_result(record)
+        if webhook:
+            threading.Thread(target=self._post_webhook, args=(webhook, record), daemon=True).start()
+
+    def _post_webhook(self, url, record):
+        try:
+            req = urllib.request.Request(
+                url, data=json.dumps(record).encode(), headers={"Content-Type": "application/json"}
+            )
+            urllib.request.urlopen(req, timeout=10).close()
+        except Exception as e:
+            print(f"[RECEIPT] Webhook {url} gagal: {e}")
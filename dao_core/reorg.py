@@ -0,0 +1,85 @@
+# ================= PENJELASAN =================
+# Pelacak hash blok terbaru (ring buffer) untuk mendeteksi reorg chain.
+# Setiap head baru dicek: jika parentHash / hash di nomor yang sama berbeda
+# dengan yang tersimpan, tracker berjalan mundur sampai menemukan blok yang
+# masih sama (titik fork). Pesanan di blok >= fork dianggap tidak pasti.
+
+
+def _hex(value):
+    return value if isinstance(value, str) else "0x" + bytes(value).hex()
+
+
+class BlockTracker:
+    """Ring buffer {nomor blok: hash} untuk N blok terakhir"""
+
+    def __init__(self, w3, size=128):
+        self.w3 = w3
+        self.size = size
+        self.hashes = {}
+        self.head = None
+
+    def hash_of(self, number):
+        """Hash kanonik yang diketahui untuk blok ini (None jika di luar buffer)"""
+        return self.hashes.get(number)
+
+    def is_canonical(self, number, block_hash):
+        """Apakah blok `number` dengan hash ini masih ada di chain kanonik"""
+        known = self.hashes.get(number)
+        if known is None:
+            known = _hex(self.w3.eth.get_block(number)['hash'])
+        return known == _hex(block_hash)
+
+    def poll(self):
+        """Ambil head terbaru via HTTP lalu cek reorg"""
+        return self.observe(self.w3.eth.get_block('latest'))
+
+    def observe(self, block):
+        """
+        Catat head baru (block / header dengan number, hash, parentHash).
+        Return nomor blok pertama yang berubah karena reorg, atau None.
+        """
+        number = block['number']
+        block_hash = _hex(block['hash'])
+        parent_hash = _hex(block['parentHash'])
+
+        forks = []
+        if self.head is not None and number - 1 > self.head:
+            # Polling lebih lambat dari block time: cek juga blok yang terlewat
+            for n in range(self.head + 1, number):
+                forks.append(self.observe(self.w3.eth.get_block(n)))
+        elif self.head is not None and number <= self.head:
+            # Head mundur / sama: blok di atas number sudah pasti yatim
+            if self.hashes.get(number) != block_hash:
+                forks.append(number)
+            elif number < self.head:
+                forks.append(number + 1)
+
+        known_parent = self.hashes.get(number - 1)
+        if known_parent is not None and known_parent != parent_hash:
+            forks.append(self._find_fork(number - 1, parent_hash))
+
+        forks = [f for f in forks if f is not None]
+        fork = min(forks) if forks else None
+
+        # Blok di atas head baru sudah yatim (hash fork..head sudah diperbarui)
+        for n in [n for n in self.hashes if n > number]:
+            del self.hashes[n]
+
+        self.hashes[number] = block_hash
+        self.hashes[number - 1] = parent_hash
+        self.head = number
+
+        # Buang hash yang sudah di luar jendela ring buffer
+        for n in [n for n in self.hashes if n <= number - self.size]:
+            del self.hashes[n]
+        return fork
+
+    def _find_fork(self, number, canonical_hash):
+        """Jalan mundur sampai hash lokal sama dengan hash kanonik"""
+        while number in self.hashes and self.hashes[number] != canonical_hash:
+            self.hashes[number] = canonical_hash
+            number -= 1
+            if number not in self.hashes:
+                break
+            canonical_hash = _hex(self.w3.eth.get_block(number)['hash'])
+        return number + 1
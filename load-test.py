@@ -0,0 +1,245 @@
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from web3 import Web3
+from dao_core.metrics import LatencyStats, fmt_seconds
+from dao_core.journal import DISPENSING
+from dao_core.fees import FeeOracle
+
+# ================= PENJELASAN =================
+# Load generator & benchmark latency jalur beli kopi.
+# Script ini membuat banyak akun pembeli, mengisi saldo (ETH untuk gas +
+# IDRT dari faucet), lalu mengirim buyCoffee(machineId) dengan laju tetap.
+#
+# Latency end-to-end = send_raw_transaction -> dispense_coffee() mulai di
+# controller. Waktu dispense dibaca dari jurnal controller (JOURNAL_PATH):
+# status "dispensing" ditulis tepat sebelum hardware bergerak.
+#
+# Cara pakai (chain lokal: Ganache / anvil / eth-tester):
+#   1. Jalankan controller: python vending-machine.py
+#   2. Jalankan benchmark  : python load-test.py (dari folder yang sama)
+
+# ================= KONFIGURASI =================
+RPC_URL = "http://127.0.0.1:7545"
+CONTRACT_ADDRESS = "0xf8F15cb408C22BE3f6dCecF806e9a4872f19Db5d"
+
+# Akun yang membiayai gas para pembeli (misal akun #0 Ganache)
+FUNDER_PRIVATE_KEY = "0x..."
+FUNDING_ETH = 1 # ETH per pembeli
+
+# Mesin tujuan (pesanan dibagi bergiliran), harus dilayani controller yang berjalan
+MACHINE_IDS = [1]
+
+NUM_BUYERS = 20       # Jumlah akun pembeli
+TARGET_RATE = 5       # Pesanan per detik
+DURATION = 60         # Lama pengiriman pesanan (detik)
+SENDER_THREADS = 8    # Thread paralel untuk send_raw_transaction
+DRAIN_TIMEOUT = 60    # Tunggu sisa pesanan selesai di controller (detik)
+
+# Jurnal dispense milik controller (sama dengan JOURNAL_PATH di vending-machine.py)
+JOURNAL_PATH = "dispense-journal.jsonl"
+JOURNAL_POLL_INTERVAL = 0.01 # Resolusi pengukuran waktu dispense
+
+TRANSFER_GAS = 21000 # Kirim ETH biasa (tanpa data)
+
+# ABI minimal yang dipakai benchmark
+CONTRACT_ABI = [
+    {"inputs": [{"name": "_machineId", "type": "uint256"}], "name": "buyCoffee", "outputs": [], "stateMutability": "nonpayable", "type": "function"},
+    {"inputs": [], "name": "coffeePrice", "outputs": [{"name": "", "type": "uint256"}], "stateMutability": "view", "type": "function"},
+    {"inputs": [], "name": "paymentToken", "outputs": [{"name": "", "type": "address"}], "stateMutability": "view", "type": "function"},
+]
+ERC20_ABI = [
+    {"constant": False, "inputs": [{"name": "_spender", "type": "address"}, {"name": "_value", "type": "uint256"}], "name": "approve", "outputs": [{"name": "", "type": "bool"}], "type": "function"},
+    {"constant": False, "inputs": [], "name": "mintaUangGratis", "outputs": [], "type": "function"}
+]
+
+# ================= SETUP SISTEM =================
+w3 = Web3(Web3.HTTPProvider(RPC_URL))
+if not w3.is_connected():
+    print(f"[ERROR] Gagal terhubung ke Blockchain via {RPC_URL}")
+    exit()
+
+# Gas limit (estimasi, di-cache per fungsi) & fee EIP-1559 sama seperti Frontend/backend
+fees = FeeOracle(w3)
+contract = w3.eth.contract(address=w3.to_checksum_address(CONTRACT_ADDRESS), abi=CONTRACT_ABI)
+
+# ================= TRANSAKSI =================
+class Sender:
+    """Akun penandatangan dengan nonce lokal (tanpa get_transaction_count per tx)"""
+
+    def __init__(self, account):
+        self.account = account
+        self.address = account.address
+        self.nonce = w3.eth.get_transaction_count(self.address)
+        self.lock = threading.Lock()
+
+    def sign(self, tx=None, call=None):
+        """
+        Tandatangani tx (atau pemanggilan fungsi contract) dengan nonce
+        berikutnya. Gas & fee dari FeeOracle (cache per fungsi / per
+        refresh_seconds), jadi umumnya tidak ada request RPC tambahan
+        sebelum send_raw_transaction. Return raw transaction.
+        """
+        with self.lock:
+            if call is not None:
+                tx = fees.build(call, self.address, self.nonce)
+            else:
+                tx = dict(tx, nonce=self.nonce, chainId=fees.chain_id, gas=TRANSFER_GAS,
+                          **fees.fees(), **{"from": self.address})
+                if "maxFeePerGas" in tx:
+                    tx["type"] = 2
+            self.nonce += 1
+        return self.account.sign_transaction(tx).raw_transaction
+
+def build_buy_call(machine_id):
+    return contract.functions.buyCoffee(machine_id)
+
+def send_all(signed_txs):
+    """Kirim sekumpulan tx lalu tunggu semuanya masuk blok"""
+    hashes = [w3.eth.send_raw_transaction(raw) for raw in signed_txs]
+    for tx_hash in hashes:
+        receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+        if receipt.status != 1:
+            raise RuntimeError(f"Transaksi setup gagal: {w3.to_hex(tx_hash)}")
+
+def setup_buyers():
+    """Buat NUM_BUYERS akun baru: isi ETH, minta IDRT dari faucet, approve contract"""
+    funder = Sender(w3.eth.account.from_key(FUNDER_PRIVATE_KEY))
+    buyers = [Sender(w3.eth.account.create()) for _ in range(NUM_BUYERS)]
+
+    print(f"[SETUP] Mengisi {NUM_BUYERS} akun pembeli @ {FUNDING_ETH} ETH...")
+    send_all([
+        funder.sign({"to": b.address, "value": w3.to_wei(FUNDING_ETH, "ether")})
+        for b in buyers
+    ])
+
+    # Faucet memberi 100.000 IDRT per panggilan
+    price = contract.functions.coffeePrice().call()
+    token = w3.eth.contract(address=contract.functions.paymentToken().call(), abi=ERC20_ABI)
+    orders_per_buyer = int(TARGET_RATE * DURATION / NUM_BUYERS) + 1
+    faucet_calls = -(-(price * orders_per_buyer) // (100_000 * 10**18))
+
+    print(f"[SETUP] Faucet IDRT ({faucet_calls}x per akun) & approve contract...")
+    txs = []
+    for b in buyers:
+        for _ in range(faucet_calls):
+            txs.append(b.sign(call=token.functions.mintaUangGratis()))
+        txs.append(b.sign(call=token.functions.approve(contract.address, price * orders_per_buyer)))
+    send_all(txs)
+    return buyers
+
+# ================= PENGUKURAN =================
+sent_at = {}               # txHash -> waktu send_raw_transaction
+dispensed_at = {}          # txHash -> waktu status "dispensing" terlihat di jurnal
+send_latency = LatencyStats(window=1_000_000)  # Durasi panggilan send_raw_transaction
+e2e_latency = LatencyStats(window=1_000_000)   # send -> dispense_coffee()
+send_errors = []
+state_lock = threading.Lock()
+
+def watch_journal(f, stop):
+    """Ikuti jurnal controller (seperti tail -f) dan catat kapan pesanan mulai dibuat"""
+    with f:
+        buffer = ""
+        while not stop.is_set():
+            chunk = f.read()
+            if not chunk:
+                time.sleep(JOURNAL_POLL_INTERVAL)
+                continue
+            now = time.time()
+            buffer += chunk
+            *lines, buffer = buffer.split("\n")
+            for line in lines:
+                if f'"{DISPENSING}"' not in line:
+                    continue
+                record = json.loads(line)
+                with state_lock:
+                    started = sent_at.get(record["tx"])
+                    if started is None or record["tx"] in dispensed_at:
+                        continue
+                    dispensed_at[record["tx"]] = now
+                e2e_latency.add(now - started)
+
+def send_order(buyer, machine_id):
+    raw = buyer.sign(call=build_buy_call(machine_id))
+    tx_hash = w3.to_hex(w3.keccak(raw))
+
+    # Dicatat sebelum dikirim: node lokal bisa menambang (dan controller
+    # memproses) pesanan sebelum send_raw_transaction kembali
+    started = time.time()
+    with state_lock:
+        sent_at[tx_hash] = started
+    try:
+        w3.eth.send_raw_transaction(raw)
+    except Exception as e:
+        with state_lock:
+            del sent_at[tx_hash]
+        send_errors.append(str(e))
+        return
+    send_latency.add(time.time() - started)
+
+def run_load(buyers):
+    """Kirim pesanan dengan laju TARGET_RATE selama DURATION detik"""
+    total = int(TARGET_RATE * DURATION)
+    print(f"[LOAD] Mengirim {total} pesanan @ {TARGET_RATE}/detik ke mesin {MACHINE_IDS}...")
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=SENDER_THREADS) as pool:
+        for i in range(total):
+            # Jadwal tetap (open loop): keterlambatan tidak menurunkan laju berikutnya
+            delay = started + i / TARGET_RATE - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(send_order, buyers[i % len(buyers)], MACHINE_IDS[i % len(MACHINE_IDS)])
+    return started, time.time()
+
+def report(load_started, load_finished):
+    sent = len(sent_at)
+    done = len(dispensed_at)
+    send_secs = max(load_finished - load_started, 1e-9)
+    lat = e2e_latency.summary()
+
+    print("\n" + "="*40)
+    print(f"[HASIL] Terkirim: {sent} ({sent / send_secs:.2f}/detik, target {TARGET_RATE}/detik) | "
+          f"Gagal kirim: {len(send_errors)}")
+    if done:
+        span = max(max(dispensed_at.values()) - load_started, 1e-9)
+        print(f"[HASIL] Dibuat controller: {done} ({done / span:.2f} pesanan/detik) | "
+              f"Belum dibuat: {sent - done}")
+    else:
+        print(f"[HASIL] Tidak ada pesanan yang terlihat di jurnal {JOURNAL_PATH}. Controller berjalan?")
+    print(f"[HASIL] Latency end-to-end p50: {fmt_seconds(lat['p50'])} p95: {fmt_seconds(lat['p95'])} "
+          f"p99: {fmt_seconds(lat['p99'])}")
+    print(f"[HASIL] send_raw_transaction p50: {fmt_seconds(send_latency.percentile(50))} "
+          f"p95: {fmt_seconds(send_latency.percentile(95))}")
+    if send_errors:
+        print(f"[HASIL] Contoh error: {send_errors[0]}")
+    print("="*40)
+
+def main():
+    # Cek konfigurasi dulu, sebelum setup akun pembeli yang memakan waktu
+    if not os.path.exists(JOURNAL_PATH):
+        print(f"[ERROR] Jurnal controller {JOURNAL_PATH} tidak ditemukan. Jalankan vending-machine.py dulu.")
+        exit()
+
+    buyers = setup_buyers()
+
+    journal_file = open(JOURNAL_PATH, "r", encoding="utf-8")
+    journal_file.seek(0, os.SEEK_END) # Abaikan pesanan sebelum benchmark
+
+    stop = threading.Event()
+    threading.Thread(target=watch_journal, args=(journal_file, stop), daemon=True).start()
+
+    load_started, load_finished = run_load(buyers)
+
+    # Tunggu controller menyelesaikan sisa antrian
+    deadline = time.time() + DRAIN_TIMEOUT
+    while len(dispensed_at) < len(sent_at) and time.time() < deadline:
+        time.sleep(0.5)
+    stop.set()
+
+    report(load_started, load_finished)
+
+if __name__ == "__main__":
+    main()
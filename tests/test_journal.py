@@ -0,0 +1,63 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from dao_core.journal import DispenseJournal, DISPENSING, DONE
+
+CONFIRMATIONS = 12
+
+
+def serve(journal, key, block):
+    """Alur controller: catat pesanan, dispense hanya jika baru. Return True jika kopi dibuat."""
+    if not journal.receive(key, block, machine_id=1, buyer="0xabc", amount=15000):
+        return False
+    journal.mark(key, DISPENSING, durable=True)
+    # Durable agar record "done" sudah di disk sebelum restart disimulasikan
+    # (controller menulisnya non-durable; group commit menyusul dalam ~50 ms)
+    journal.mark(key, DONE, durable=True)
+    return True
+
+
+def test_restart_replay_does_not_dispense_twice(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    orders = [(("0x%02x" % b, 0), b) for b in (80, 95, 100)]
+
+    journal = DispenseJournal(path, retain_blocks=CONFIRMATIONS)
+    assert all(serve(journal, key, block) for key, block in orders)
+    journal.checkpoint(100)
+    journal.flush()
+
+    # Restart: replay mulai dari last_block - CONFIRMATIONS (seperti start_listening)
+    for _ in range(2):
+        journal = DispenseJournal(path, retain_blocks=CONFIRMATIONS)
+        replay_from = journal.last_block - CONFIRMATIONS
+        assert replay_from == 88
+        replayed = [serve(journal, key, block) for key, block in orders if block >= replay_from]
+        assert replayed == [False, False]
+
+
+def test_compaction_drops_done_orders_before_replay_window(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    journal = DispenseJournal(path, retain_blocks=CONFIRMATIONS)
+    serve(journal, ("0x01", 0), 50)
+    serve(journal, ("0x02", 0), 95)
+    journal.checkpoint(100)
+    journal.flush()
+
+    journal = DispenseJournal(path, retain_blocks=CONFIRMATIONS)
+    assert journal.state(("0x01", 0)) is None
+    assert journal.state(("0x02", 0)) == DONE
+
+
+def test_horizon_marks_oldest_replayable_block(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    journal = DispenseJournal(path, retain_blocks=CONFIRMATIONS)
+    assert journal.horizon is None
+    serve(journal, ("0x01", 0), 50)
+    journal.checkpoint(100)
+    journal.flush()
+
+    journal = DispenseJournal(path, retain_blocks=CONFIRMATIONS)
+    assert journal.horizon == 88
+    # Pesanan di bawah horizon sudah dilupakan -> catch-up tidak boleh mulai di sana
+    assert journal.state(("0x01", 0)) is None
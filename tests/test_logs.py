@@ -0,0 +1,60 @@
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from dao_core.logs import LogBackfiller, is_range_error
+
+
+class FakeNode:
+    """eth_getLogs palsu: satu log per blok, tolak rentang > max_range"""
+
+    def __init__(self, max_range=None, error=None):
+        self.max_range = max_range
+        self.error = error
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def fetch(self, a, b):
+        with self._lock:
+            self.calls += 1
+        if self.error is not None:
+            raise self.error
+        if self.max_range is not None and b - a + 1 > self.max_range:
+            raise ValueError({"code": -32005, "message": "query returned more than 10000 results"})
+        return [{"blockNumber": n, "logIndex": 0} for n in range(a, b + 1)]
+
+
+def test_splits_range_errors_and_keeps_order():
+    node = FakeNode(max_range=100)
+    backfiller = LogBackfiller(node.fetch, chunk_size=1000)
+    logs = backfiller.fetch_all(0, 4999)
+    assert [e["blockNumber"] for e in logs] == list(range(5000))
+    assert node.calls < 500
+
+
+def test_connection_error_is_raised_without_splitting():
+    node = FakeNode(error=ConnectionError("node mati"))
+    backfiller = LogBackfiller(node.fetch, chunk_size=2000, workers=4)
+    with pytest.raises(ConnectionError):
+        backfiller.fetch_all(0, 9999)
+    assert node.calls <= 4
+    assert backfiller.chunk_size == 2000
+
+
+def test_rate_limit_is_not_a_range_error():
+    assert not is_range_error(ValueError("429 Too Many Requests"))
+    assert is_range_error(ValueError("Log response size exceeded"))
+    assert is_range_error(TimeoutError())
+    assert not is_range_error(ConnectionError())
+
+
+def test_chunk_size_grows_back_after_split():
+    node = FakeNode(max_range=50)
+    backfiller = LogBackfiller(node.fetch, chunk_size=400, target_logs=1000)
+    backfiller.fetch_all(0, 999)
+    node.max_range = None
+    backfiller.fetch_all(1000, 50000)
+    assert backfiller.chunk_size > 400
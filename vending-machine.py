@@ -1,22 +1,92 @@
 import time
 import json
-from web3 import Web3
+import asyncio
+import threading
+from functools import lru_cache
+from web3 import Web3, AsyncWeb3, WebSocketProvider
+from dao_core.logs import EventLogReader, LogBackfiller, uint256_topic
+from dao_core.metrics import CountingHTTPProvider, LatencyStats, fmt_seconds
+from dao_core.dispenser import DispenseQueue
+from dao_core.journal import DispenseJournal, DISPENSING, DONE
+from dao_core.reorg import BlockTracker
 
 # ================= PENJELASAN =================
 # Kode simulasi IoT Vending Machine (Dengan ID Mesin)
 # Script ini hanya akan merespons jika event dari blockchain
 # memiliki machineId yang cocok dengan konfigurasi mesin ini.
+# Filter machineId dilakukan di NODE (topic1), jadi controller hanya
+# mengunduh pesanan milik mesinnya sendiri.
 
 # ================= KONFIGURASI =================
 # 1. Identitas Mesin (PENTING: Sesuaikan dengan ID saat addMachine di Contract)
 MY_MACHINE_ID = 1 
 
+# 1b. Mode Gateway (Opsional)
+# Satu proses melayani banyak mesin dengan SATU subscription event bersama;
+# setiap mesin punya worker dispense & driver hardware sendiri.
+# MACHINE_IDS   : daftar mesin dengan driver default, contoh: [1, 2, 3]
+# GATEWAY_CONFIG: path file JSON {"<machineId>": "<nama driver>"}, contoh:
+#                 {"1": "simulasi", "2": "simulasi"} (lihat HARDWARE_DRIVERS)
+# Keduanya None = hanya MY_MACHINE_ID.
+MACHINE_IDS = None
+GATEWAY_CONFIG = None
+DEFAULT_DRIVER = "simulasi"
+
 # 2. Koneksi Blockchain
 RPC_URL = "http://127.0.0.1:7545" # Sesuaikan dengan Ganache/Testnet
 
+# 2b. WebSocket (Opsional, push-based)
+# Jika diisi, event diterima lewat eth_subscribe('logs') tanpa polling.
+# Jika socket putus, otomatis fallback ke polling HTTP (RPC_URL).
+WS_URL = None # Contoh: "ws://127.0.0.1:7545"
+WS_RETRY_SECONDS = 30 # Selama fallback, coba sambung ulang WebSocket tiap N detik
+
+# 2c. Polling Adaptif (dipakai jika WS_URL kosong / sedang fallback)
+POLL_MIN_INTERVAL = 0.5 # Detik, saat ada pesanan masuk
+POLL_MAX_INTERVAL = 5   # Detik, saat mesin sepi
+
+# 2d. Metrik (latency & jumlah request RPC) dicetak tiap N detik
+METRICS_INTERVAL = 60
+
+# 2e. Antrian Dispense
+# Listener memasukkan pesanan ke antrian; hardware diproses worker terpisah.
+DISPENSE_QUEUE_SIZE = 20 # Maks pesanan antre per mesin
+
+# Tahapan hardware: (nama langkah, durasi detik)
+HARDWARE_STAGES = [
+    ("Menurunkan Gelas", 1),
+    ("Menggiling Biji Kopi", 1),
+    ("Menuang Air Panas", 1),
+]
+
+# 2f. Konfirmasi Blok & Reorg (per chain ID)
+# confirmations       : jumlah blok di atas blok pembayaran sebelum kopi dibuat (0 = langsung)
+# speculative_max_idrt: pesanan <= nilai ini dibuat langsung tanpa menunggu konfirmasi
+#                       (lebih cepat, tapi bisa rugi 1 cup jika terjadi reorg). None = nonaktif.
+#                       Harus di bawah harga kopi, kalau tidak SEMUA pesanan melewati konfirmasi.
+CHAIN_POLICIES = {
+    1337:  {"confirmations": 0,  "speculative_max_idrt": None},  # Ganache lokal (tanpa reorg)
+    137:   {"confirmations": 32, "speculative_max_idrt": None},  # Polygon PoS
+    80002: {"confirmations": 12, "speculative_max_idrt": None},  # Polygon Amoy (testnet)
+}
+DEFAULT_CHAIN_POLICY = {"confirmations": 12, "speculative_max_idrt": None}
+
 # 3. Alamat Smart Contract Fleet (Update setiap deploy ulang!)
 CONTRACT_ADDRESS = "0xf8F15cb408C22BE3f6dCecF806e9a4872f19Db5d" 
 
+# 3b. Mode Catch-Up (Opsional)
+# Isi nomor blok (misal blok saat mesin terakhir mati) untuk memproses pesanan
+# yang terlewat sebelum mulai mendengarkan event baru.
+# None = lanjut otomatis dari blok terakhir di jurnal dispense.
+# Nilai di bawah horizon jurnal (blok terakhir - konfirmasi) dinaikkan ke
+# horizon, karena pesanan yang sudah selesai di bawahnya tidak tercatat lagi.
+CATCH_UP_FROM_BLOCK = None
+
+# 3c. Jurnal Dispense (exactly-once)
+# Mencatat setiap pesanan (txHash, logIndex) agar tidak ada kopi yang
+# terlewat / keluar dua kali walaupun controller restart.
+JOURNAL_PATH = "dispense-journal.jsonl"
+
 # 4. ABI (Update dari Remix setelah compile VendingMachineFleet.sol)
 # Pastikan ABI ini milik VendingMachineFleet, bukan contract lama.
 CONTRACT_ABI = '''
@@ -885,11 +955,22 @@ CONTRACT_ABI = '''
 '''
 
 # ================= SETUP SISTEM =================
+def load_machines():
+    """Daftar mesin yang dilayani proses ini: {machineId: nama driver hardware}"""
+    if GATEWAY_CONFIG:
+        with open(GATEWAY_CONFIG, "r", encoding="utf-8") as f:
+            return {int(mid): driver for mid, driver in json.load(f).items()}
+    return {mid: DEFAULT_DRIVER for mid in (MACHINE_IDS or [MY_MACHINE_ID])}
+
+MACHINES = load_machines()
+SERVED_MACHINE_IDS = list(MACHINES)
+
 try:
-    w3 = Web3(Web3.HTTPProvider(RPC_URL))
+    rpc_provider = CountingHTTPProvider(RPC_URL)
+    w3 = Web3(rpc_provider)
     if w3.is_connected():
         print(f"[SYSTEM] Terhubung ke Blockchain via {RPC_URL}")
-        print(f"[SYSTEM] Mengontrol Mesin ID: {MY_MACHINE_ID}")
+        print(f"[SYSTEM] Mengontrol Mesin ID: {', '.join(map(str, SERVED_MACHINE_IDS))}")
     else:
         print("[ERROR] Gagal terhubung ke Blockchain")
         exit()
@@ -900,62 +981,407 @@ except Exception as e:
 # Ubah address menjadi format checksum
 CONTRACT_ADDRESS = w3.to_checksum_address(CONTRACT_ADDRESS)
 
+# Kebijakan konfirmasi sesuai chain yang terhubung
+CHAIN_ID = w3.eth.chain_id
+CHAIN_POLICY = CHAIN_POLICIES.get(CHAIN_ID, DEFAULT_CHAIN_POLICY)
+CONFIRMATIONS = CHAIN_POLICY["confirmations"]
+SPECULATIVE_MAX_WEI = (
+    None if CHAIN_POLICY["speculative_max_idrt"] is None
+    else CHAIN_POLICY["speculative_max_idrt"] * 10**18
+)
+print(f"[SYSTEM] Chain ID {CHAIN_ID}: tunggu {CONFIRMATIONS} konfirmasi, "
+      f"spekulatif <= {CHAIN_POLICY['speculative_max_idrt'] or '-'} IDRT")
+
+# Ring buffer hash blok untuk deteksi reorg
+block_tracker = BlockTracker(w3)
+
 # Setup Kontrak
 contract = w3.eth.contract(address=CONTRACT_ADDRESS, abi=json.loads(CONTRACT_ABI))
 
+# Jurnal dispense (dibaca ulang saat startup)
+journal = DispenseJournal(JOURNAL_PATH, retain_blocks=CONFIRMATIONS)
+
+# Pembaca log CoffeeOrdered (eth_getLogs) untuk catch-up & tutup celah
+order_reader = EventLogReader(w3, contract, ["CoffeeOrdered"])
+
+# topic0 = CoffeeOrdered, topic1 = machineId (OR-list mesin yang dilayani).
+# Node hanya mengirim pesanan untuk mesin ini, bukan semua pesanan armada.
+ORDER_TOPICS = order_reader.topic_filter([uint256_topic(i) for i in SERVED_MACHINE_IDS])
+
+def fetch_my_orders(from_block, to_block):
+    return order_reader.fetch(from_block, to_block, topics=ORDER_TOPICS)
+
 # ================= FUNGSI HARDWARE =================
-def dispense_coffee(buyer_address, amount_paid):
+def dispense_coffee(buyer_address, amount_paid, machine_id=MY_MACHINE_ID):
     """
     Fungsi ini mensimulasikan motor/servo vending machine.
     """
     amount_rupiah = amount_paid / (10**18) # Konversi dari Wei ke Rupiah (asumsi 18 desimal)
     
     print("\n" + "="*40)
-    print(f"[MESIN #{MY_MACHINE_ID}] PESANAN DITERIMA!")
+    print(f"[MESIN #{machine_id}] PESANAN DITERIMA!")
     print(f" -> Pembeli : {buyer_address}")
     print(f" -> Bayar   : {amount_rupiah} IDRT")
     print(f" -> Status  : VERIFIED ON-CHAIN")
     
-    print("[HARDWARE] 1. Menurunkan Gelas...")
-    time.sleep(1)
-    print("[HARDWARE] 2. Menggiling Biji Kopi...")
-    time.sleep(1)
-    print("[HARDWARE] 3. Menuang Air Panas...")
-    time.sleep(1)
-    print(f"[HARDWARE] 4. SELESAI! Silakan ambil kopi di Mesin #{MY_MACHINE_ID}.")
+    for step, (stage, duration) in enumerate(HARDWARE_STAGES, start=1):
+        print(f"[HARDWARE] {step}. {stage}...")
+        time.sleep(duration)
+    print(f"[HARDWARE] {len(HARDWARE_STAGES) + 1}. SELESAI! Silakan ambil kopi di Mesin #{machine_id}.")
     print("="*40 + "\n")
 
+# Driver hardware yang bisa dipilih per mesin di GATEWAY_CONFIG.
+# Driver = fungsi (buyer_address, amount_paid, machine_id); tambahkan driver
+# GPIO / serial di sini untuk mesin fisik.
+HARDWARE_DRIVERS = {
+    "simulasi": dispense_coffee,
+}
+
+for mid, driver in MACHINES.items():
+    if driver not in HARDWARE_DRIVERS:
+        print(f"[ERROR] Driver '{driver}' untuk Mesin #{mid} tidak dikenal "
+              f"(pilihan: {', '.join(HARDWARE_DRIVERS)})")
+        exit()
+
+# ================= CATCH-UP (PESANAN TERLEWAT) =================
+def catch_up(from_block, to_block):
+    """
+    Proses ulang CoffeeOrdered di rentang blok lama (misal saat mesin mati).
+    Histori diambil per chunk adaptif + paralel oleh LogBackfiller.
+    """
+    print(f"[CATCH-UP] Memindai blok {from_block} s/d {to_block}...")
+    backfiller = LogBackfiller(fetch_my_orders)
+
+    served = 0
+    for event in backfiller.fetch_all(from_block, to_block):
+        # Pesanan lama tidak dihitung di metrik latency (live=False)
+        if handle_order(event, live=False):
+            served += 1
+    journal.checkpoint(max(to_block - CONFIRMATIONS, 0))
+    print(f"[CATCH-UP] Selesai. {served} pesanan terlewat masuk antrian.")
+
+# ================= METRIK =================
+# Latency pesanan -> kopi mulai dibuat (dihitung dari timestamp blok pembayaran)
+order_latency = LatencyStats()
+machine_latency = {mid: LatencyStats() for mid in SERVED_MACHINE_IDS}
+# Latency pesanan -> masuk antrian (harus tetap datar walau mesin sibuk)
+intake_latency = LatencyStats()
+# Latency pesanan -> dianggap final (lolos N konfirmasi)
+finality_latency = LatencyStats()
+reorg_stats = {"reorgs": 0, "rescinded": 0, "speculative": 0, "speculative_lost": 0}
+ws_messages = 0
+
+@lru_cache(maxsize=256)
+def block_timestamp(block_number):
+    return w3.eth.get_block(block_number)['timestamp']
+
+def report_metrics():
+    """Thread background: cetak metrik tiap METRICS_INTERVAL detik"""
+    while True:
+        time.sleep(METRICS_INTERVAL)
+        lat = order_latency.summary()
+        print(f"[METRIK] Pesanan: {lat['count']} | Latency median: {fmt_seconds(lat['p50'])} "
+              f"p95: {fmt_seconds(lat['p95'])} | Intake median: {fmt_seconds(intake_latency.percentile(50))} "
+              f"| RPC: {rpc_provider.request_count} request "
+              f"({rpc_provider.requests_per_minute():.1f}/menit) | Pesan WS: {ws_messages}")
+        print(f"[METRIK] Dispense: {dispenser.served} cup | Gagal: {dispenser.failed} | "
+              f"Antrian: {dispenser.depth()} (maks {dispenser.max_depth}) | "
+              f"Tunggu p95: {fmt_seconds(dispenser.wait_time.percentile(95))} | "
+              f"Antrian penuh: {dispenser.full_events}x")
+        if CONFIRMATIONS:
+            print(f"[METRIK] Finality median: {fmt_seconds(finality_latency.percentile(50))} "
+                  f"p95: {fmt_seconds(finality_latency.percentile(95))} | Menunggu konfirmasi: "
+                  f"{len(unconfirmed)} | Reorg: {reorg_stats['reorgs']} | Dibatalkan: "
+                  f"{reorg_stats['rescinded']} | Spekulatif: {reorg_stats['speculative']} "
+                  f"(hilang karena reorg: {reorg_stats['speculative_lost']})")
+        if len(SERVED_MACHINE_IDS) > 1:
+            for mid in SERVED_MACHINE_IDS:
+                stats = dispenser.machine_stats[mid]
+                print(f"[METRIK] Mesin #{mid} ({MACHINES[mid]}): {stats['served']} cup | "
+                      f"Gagal: {stats['failed']} | Antrian: {dispenser.depth(mid)} (maks {stats['max_depth']}) | "
+                      f"Latency median: {fmt_seconds(machine_latency[mid].percentile(50))} "
+                      f"p95: {fmt_seconds(machine_latency[mid].percentile(95))} | "
+                      f"Antrian penuh: {stats['full_events']}x")
+
 # ================= LOOP UTAMA (LISTENER) =================
+# Blok terakhir yang sudah diproses, supaya saat pindah WS <-> polling
+# tidak ada pesanan yang terlewat.
+last_seen_block = None
+# Pesanan yang menunggu N konfirmasi: key -> (event, ordered_at)
+unconfirmed = {}
+# Pesanan spekulatif yang sudah dibuat sebelum final: key -> nomor blok
+speculative_orders = {}
+
+def order_key(event):
+    return (w3.to_hex(event['transactionHash']), event['logIndex'])
+
+def accept_order(event, ordered_at):
+    """
+    Catat pesanan di jurnal lalu masukkan ke antrian dispense.
+    Log yang terkirim ulang (overlap WS/polling, replay setelah restart)
+    sudah ada di jurnal sehingga dilewati. Return True jika pesanan baru.
+    """
+    key = order_key(event)
+    machine_id = event['args']['machineId']
+    buyer = event['args']['buyer']
+    amount = event['args']['amount']
+
+    if not journal.receive(key, event['blockNumber'], machine_id=machine_id, buyer=buyer, amount=amount):
+        return False
+
+    dispenser.submit(machine_id, {
+        "key": key,
+        "buyer": buyer,
+        "amount": amount,
+        "machine_id": machine_id,
+        "ordered_at": ordered_at,
+    })
+    return True
+
+def handle_order(event, live=True):
+    """
+    Proses satu event CoffeeOrdered (dari WebSocket, polling, atau catch-up).
+    Dengan CONFIRMATIONS > 0, pesanan ditahan sampai final kecuali
+    nilainya masuk batas spekulatif. Return True jika pesanan baru.
+    """
+    global last_seen_block
+
+    last_seen_block = max(last_seen_block or 0, event['blockNumber'])
+
+    # Node sudah memfilter machineId (topic1); cek ini hanya pengaman
+    if event['args']['machineId'] not in SERVED_MACHINE_IDS:
+        return False
+    key = order_key(event)
+    if journal.state(key) is not None or key in unconfirmed:
+        return False
+
+    ordered_at = block_timestamp(event['blockNumber']) if live else None
+    speculative = SPECULATIVE_MAX_WEI is not None and event['args']['amount'] <= SPECULATIVE_MAX_WEI
+
+    if CONFIRMATIONS and not speculative:
+        # Tunggu konfirmasi; dicek ulang di confirm_orders() setiap head baru
+        unconfirmed[key] = (event, ordered_at)
+        confirm_orders()
+        return True
+
+    # Masuk antrian lalu langsung kembali mendengarkan event
+    if not accept_order(event, ordered_at):
+        return False
+    if CONFIRMATIONS:
+        speculative_orders[key] = event['blockNumber']
+        reorg_stats["speculative"] += 1
+    if ordered_at is not None:
+        intake_latency.add(max(time.time() - ordered_at, 0))
+    return True
+
+def confirm_orders():
+    """Pindahkan pesanan yang sudah lolos N konfirmasi ke antrian dispense"""
+    if block_tracker.head is None:
+        block_tracker.poll()
+    safe_head = block_tracker.head - CONFIRMATIONS
+
+    for key, (event, ordered_at) in list(unconfirmed.items()):
+        if event['blockNumber'] > safe_head:
+            continue
+        del unconfirmed[key]
+        if not block_tracker.is_canonical(event['blockNumber'], event['blockHash']):
+            rescind_order(key, "blok pembayaran sudah tidak kanonik")
+            continue
+        if ordered_at is not None:
+            finality_latency.add(max(time.time() - ordered_at, 0))
+        accept_order(event, ordered_at)
+
+    # Pesanan spekulatif yang sudah final tidak perlu dipantau lagi
+    for key, block in list(speculative_orders.items()):
+        if block <= safe_head:
+            del speculative_orders[key]
+
+def rescind_order(key, reason):
+    """Batalkan pesanan yang hilang karena reorg"""
+    if key in unconfirmed:
+        del unconfirmed[key]
+    if journal.state(key) is None:
+        reorg_stats["rescinded"] += 1
+        print(f"[REORG] Pesanan {key[0]} dibatalkan sebelum dibuat ({reason}).")
+    elif key in speculative_orders:
+        del speculative_orders[key]
+        reorg_stats["speculative_lost"] += 1
+        print(f"[REORG] PERHATIAN: pesanan spekulatif {key[0]} sudah dibuat, "
+              f"tapi pembayarannya hilang karena reorg ({reason}).")
+
+def handle_reorg(fork_block):
+    """Reorg mulai fork_block: batalkan pesanan di blok yatim lalu ambil ulang log kanonik"""
+    global last_seen_block
+
+    reorg_stats["reorgs"] += 1
+    print(f"[REORG] Reorganisasi chain terdeteksi mulai blok {fork_block}.")
+
+    for key, (event, _) in list(unconfirmed.items()):
+        if event['blockNumber'] >= fork_block:
+            rescind_order(key, f"blok {event['blockNumber']} yatim")
+    for key, block in list(speculative_orders.items()):
+        if block >= fork_block:
+            rescind_order(key, f"blok {block} yatim")
+
+    # Pesanan yang masuk ulang di blok kanonik akan diterima lagi
+    last_seen_block = min(last_seen_block or fork_block, fork_block - 1)
+    fill_gap()
+
+def check_chain(header=None):
+    """Cek head baru (dari newHeads WS atau polling): deteksi reorg & konfirmasi pesanan"""
+    fork = block_tracker.observe(header) if header is not None else block_tracker.poll()
+    if fork is not None:
+        handle_reorg(fork)
+    confirm_orders()
+
+def serve_order(job):
+    """Dijalankan worker dispenser untuk setiap pesanan di antrian"""
+    # Status "dispensing" harus tersimpan di disk SEBELUM hardware bergerak
+    journal.mark(job["key"], DISPENSING, durable=True)
+    if job["ordered_at"] is not None:
+        latency = max(time.time() - job["ordered_at"], 0)
+        order_latency.add(latency)
+        machine_latency[job["machine_id"]].add(latency)
+    driver = HARDWARE_DRIVERS[MACHINES[job["machine_id"]]]
+    driver(job["buyer"], job["amount"], job["machine_id"])
+    journal.mark(job["key"], DONE)
+
+dispenser = DispenseQueue(serve_order, SERVED_MACHINE_IDS, maxsize=DISPENSE_QUEUE_SIZE)
+
+def fill_gap():
+    """Ambil pesanan yang masuk sejak last_seen_block (dipakai saat ganti mode)"""
+    global last_seen_block
+
+    head = w3.eth.block_number
+    if last_seen_block is not None and last_seen_block < head:
+        for event in LogBackfiller(fetch_my_orders).fetch_all(last_seen_block + 1, head):
+            handle_order(event)
+    last_seen_block = max(last_seen_block or 0, head)
+    # Blok yang belum final belum boleh di-checkpoint (bisa kena reorg)
+    journal.checkpoint(max(last_seen_block - CONFIRMATIONS, 0))
+
+async def listen_websocket():
+    """Push-based: node mengirim log CoffeeOrdered begitu blok ditambang"""
+    global ws_messages
+
+    async with AsyncWeb3(WebSocketProvider(WS_URL)) as aw3:
+        await aw3.eth.subscribe("logs", {"address": CONTRACT_ADDRESS, "topics": ORDER_TOPICS})
+        # Head baru dibutuhkan untuk menghitung konfirmasi & deteksi reorg
+        heads_sub = await aw3.eth.subscribe("newHeads") if CONFIRMATIONS else None
+        print(f"[LISTENER] Subscribe WebSocket aktif ({WS_URL})")
+
+        # Handler memakai Web3 HTTP sync (getLogs, getBlock, antrian dispenser
+        # yang bisa menahan saat penuh) -> dijalankan di thread lain agar loop
+        # WebSocket tetap membaca pesan. Tetap di-await satu per satu, jadi
+        # urutan pemrosesan sama seperti sebelumnya.
+        # Tutup celah antara polling terakhir dan subscription aktif
+        await asyncio.to_thread(fill_gap)
+
+        async for payload in aw3.socket.process_subscriptions():
+            ws_messages += 1
+            if heads_sub is not None and payload['subscription'] == heads_sub:
+                await asyncio.to_thread(check_chain, payload['result'])
+                continue
+
+            log = payload['result']
+            if log.get('removed'):
+                # Node memberi tahu log ini hilang karena reorg
+                await asyncio.to_thread(rescind_order, order_key(log), "log removed oleh node")
+                continue
+            await asyncio.to_thread(handle_order, contract.events.CoffeeOrdered().process_log(log))
+
+def listen_polling(max_duration=None):
+    """
+    Polling HTTP adaptif: interval mengecil saat ada pesanan, membesar saat sepi.
+    Jika max_duration diisi, kembali setelah N detik (untuk coba WS lagi).
+    """
+    # Mulai tepat setelah blok terakhir yang sudah diproses
+    fill_gap()
+    event_filter = contract.events.CoffeeOrdered.create_filter(
+        from_block=last_seen_block + 1,
+        argument_filters={'machineId': SERVED_MACHINE_IDS},
+    )
+    interval = POLL_MIN_INTERVAL
+    started = time.time()
+
+    while max_duration is None or time.time() - started < max_duration:
+        entries = event_filter.get_new_entries()
+        for event in entries:
+            handle_order(event)
+        if CONFIRMATIONS:
+            check_chain()
+
+        busy = entries or unconfirmed
+        interval = POLL_MIN_INTERVAL if busy else min(interval * 1.5, POLL_MAX_INTERVAL)
+        time.sleep(interval)
+
+def resume_from_journal():
+    """Lanjutkan pesanan yang tertunda saat controller terakhir mati"""
+    for rec in journal.in_doubt():
+        # Hardware sempat bergerak: jangan dibuat ulang otomatis (hindari double)
+        print(f"[JURNAL] PERHATIAN: pesanan {rec['tx']} (Mesin #{rec['machine_id']}) terputus "
+              f"saat dispensing. Mohon cek fisik mesin.")
+        journal.mark((rec['tx'], rec['log']), DONE)
+
+    pending = [rec for rec in journal.pending() if rec['machine_id'] in SERVED_MACHINE_IDS]
+    for rec in pending:
+        dispenser.submit(rec['machine_id'], {
+            "key": (rec['tx'], rec['log']),
+            "buyer": rec['buyer'],
+            "amount": rec['amount'],
+            "machine_id": rec['machine_id'],
+            "ordered_at": None,
+        })
+    if pending:
+        print(f"[JURNAL] {len(pending)} pesanan tertunda dimasukkan kembali ke antrian.")
+
 def start_listening():
+    global last_seen_block
+
+    dispenser.start()
+    resume_from_journal()
+
+    # Replay dari blok terakhir di jurnal (inklusif: pesanan di blok yang
+    # sama bisa saja belum semua tercatat; duplikat dilewati oleh jurnal).
+    # Mundur CONFIRMATIONS blok untuk pesanan yang masih menunggu konfirmasi.
+    from_block = CATCH_UP_FROM_BLOCK
+    if from_block is None and journal.last_block is not None:
+        from_block = max(journal.last_block - CONFIRMATIONS, 0)
+    if from_block is not None and journal.horizon is not None and from_block < journal.horizon:
+        # Pesanan "done" di bawah horizon sudah dibuang dari jurnal: replay dari
+        # sana akan dianggap pesanan baru dan kopinya keluar dua kali
+        print(f"[JURNAL] CATCH_UP_FROM_BLOCK {from_block} di bawah horizon jurnal "
+              f"(blok {journal.horizon}). Catch-up dimulai dari blok {journal.horizon}.")
+        from_block = journal.horizon
+    if from_block is not None:
+        head = w3.eth.block_number
+        catch_up(from_block, head)
+        # Lanjut live tepat setelah blok terakhir yang sudah di-catch-up
+        last_seen_block = head
+
+    threading.Thread(target=report_metrics, daemon=True).start()
     print(f"[LISTENER] Menunggu Event 'CoffeeOrdered'...")
-    
-    # Membuat filter event dari blok terbaru
-    event_filter = contract.events.CoffeeOrdered.create_filter(from_block='latest')
 
     while True:
         try:
-            # Cek apakah ada event baru
-            for event in event_filter.get_new_entries():
-                # Ambil data dari event
-                machine_id = event['args']['machineId']
-                buyer = event['args']['buyer']
-                amount = event['args']['amount']
-                
-                # Filter Berdasarkan ID Mesin
-                if machine_id == MY_MACHINE_ID:
-                    dispense_coffee(buyer, amount)
-                else:
-                    # Log sederhana supaya tahu ada aktivitas di mesin lain
-                    print(f"[INFO] Pesanan masuk untuk Mesin #{machine_id} (Diabaikan oleh Mesin #{MY_MACHINE_ID})")
-                
-            time.sleep(1) # Cek setiap 1 detik
-            
+            if WS_URL:
+                try:
+                    asyncio.run(listen_websocket())
+                    print("[WS] Stream WebSocket berhenti. Fallback ke polling HTTP.")
+                except Exception as e:
+                    print(f"[WS] Koneksi WebSocket gagal/terputus: {e}. Fallback ke polling HTTP.")
+                listen_polling(max_duration=WS_RETRY_SECONDS)
+            else:
+                listen_polling()
+
         except KeyboardInterrupt:
             print("[STOP] Mematikan mesin...")
+            if dispenser.depth():
+                print(f"[STOP] PERHATIAN: {dispenser.depth()} pesanan masih di antrian dan belum dibuat.")
             break
         except Exception as e:
             print(f"[ERROR] Loop: {e}")
             time.sleep(5)
 
 if __name__ == "__main__":
-    start_listening()
\ No newline at end of file
+    start_listening()